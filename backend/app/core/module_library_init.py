@@ -10,7 +10,7 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-from ..models.module_library import initialize_module_library, get_module_library
+from ..models.module_library import initialize_module_library, get_module_library, ModuleValidationCode
 from ..core.asset_manager import initialize_asset_manager, get_asset_manager
 
 logger = logging.getLogger(__name__)
@@ -172,7 +172,7 @@ def validate_module_library_setup() -> bool:
             # Filter out asset file errors for placeholder files
             filtered_errors = [
                 error for error in errors 
-                if "Asset file not found" not in error
+                if error.code != ModuleValidationCode.ASSET_NOT_FOUND
             ]
             if filtered_errors:
                 validation_errors.extend(filtered_errors)
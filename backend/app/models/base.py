@@ -1,10 +1,15 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field, field_validator, model_validator, computed_field
 from enum import Enum
+from collections import Counter
 from datetime import datetime
 import math
 
 
+# Allowed deviation of MissionParameters.priority_weights from a total of 1.0
+PRIORITY_WEIGHT_TOLERANCE = 1e-3
+
+
 class ModuleType(str, Enum):
     SLEEP_QUARTER = "sleep_quarter"
     GALLEY = "galley"
@@ -121,6 +126,7 @@ class EnvelopeSpec(BaseModel):
         return 0.0
 
     model_config = {
+        "frozen": True,
         "use_enum_values": True,
         "json_schema_extra": {
             "example": {
@@ -232,7 +238,7 @@ class ModuleSpec(BaseModel):
 class ModulePlacement(BaseModel):
     module_id: str = Field(..., min_length=1, max_length=255, description="Module identifier")
     type: ModuleType = Field(..., description="Module functional type")
-    position: List[float] = Field(..., min_length=3, max_length=3, description="[x, y, z] position in meters")
+    position: Tuple[float, float, float] = Field(..., description="(x, y, z) position in meters")
     rotation_deg: float = Field(..., description="Rotation around Z-axis in degrees")
     connections: List[str] = Field(default_factory=list, description="Connected module IDs")
     is_valid: Optional[bool] = Field(None, description="Validation status of placement")
@@ -241,11 +247,9 @@ class ModulePlacement(BaseModel):
     @field_validator('position')
     @classmethod
     def validate_position(cls, v):
-        if len(v) != 3:
-            raise ValueError('Position must be a 3D coordinate [x, y, z]')
-        
+        # Length and element types are enforced by the fixed-length tuple annotation
         for i, coord in enumerate(v):
-            if not isinstance(coord, (int, float)) or not math.isfinite(coord):
+            if not math.isfinite(coord):
                 raise ValueError(f'Position coordinate {i} must be a finite number')
         
         return v
@@ -263,7 +267,7 @@ class ModulePlacement(BaseModel):
     @property
     def position_magnitude(self) -> float:
         """Calculate distance from origin"""
-        return math.sqrt(sum(coord ** 2 for coord in self.position))
+        return math.hypot(*self.position)
 
     model_config = {
         "use_enum_values": True,
@@ -324,9 +328,9 @@ class MissionParameters(BaseModel):
             if weight < 0:
                 raise ValueError(f'Priority weight for {key} cannot be negative')
         
-        # Check that weights sum to approximately 1.0
-        total = sum(v.values())
-        if abs(total - 1.0) > 0.001:
+        # Check that weights sum to approximately 1.0 (fsum is exact, so no drift)
+        total = math.fsum(v.values())
+        if not math.isclose(total, 1.0, rel_tol=0.0, abs_tol=PRIORITY_WEIGHT_TOLERANCE):
             raise ValueError(f'Priority weights must sum to 1.0, got {total:.3f}')
         
         return v
@@ -371,6 +375,7 @@ class MissionParameters(BaseModel):
         return sum(self.activity_schedule.values())
 
     model_config = {
+        "frozen": True,
         "json_schema_extra": {
             "example": {
                 "crew_size": 4,
@@ -486,6 +491,7 @@ class PerformanceMetrics(BaseModel):
         return issues
 
     model_config = {
+        "frozen": True,
         "json_schema_extra": {
             "example": {
                 "mean_transit_time": 45.5,
@@ -570,15 +576,16 @@ class LayoutSpec(BaseModel):
         """Number of modules in the layout"""
         return len(self.modules)
 
+    @property
+    def _type_counter(self) -> Counter:
+        """Module counts keyed by ModuleType"""
+        return Counter(ModuleType(module.type) for module in self.modules)
+
     @computed_field
     @property
     def module_types_count(self) -> Dict[str, int]:
         """Count of each module type in the layout"""
-        type_counts = {}
-        for module in self.modules:
-            module_type = module.type if isinstance(module.type, str) else module.type.value
-            type_counts[module_type] = type_counts.get(module_type, 0) + 1
-        return type_counts
+        return {module_type.value: count for module_type, count in self._type_counter.items()}
 
     @computed_field
     @property
@@ -6,10 +6,12 @@ metadata, and provides functionality for loading, validating, and caching
 module definitions.
 """
 
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from pathlib import Path
+from enum import Enum
 import json
 import hashlib
+import os
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field, field_validator
 import logging
@@ -19,6 +21,31 @@ from .base import ModuleSpec, ModuleType, BoundingBox, ModuleMetadata
 logger = logging.getLogger(__name__)
 
 
+class ModuleValidationCode(str, Enum):
+    """Machine-readable codes for ModuleLibrary.validate_module errors"""
+    SPEC_INVALID = "spec_invalid"
+    ASSET_NOT_FOUND = "asset_not_found"
+    AIRLOCK_PORTS = "airlock_ports"
+    GALLEY_SERVICE_PORT = "galley_service_port"
+    POWER_EXCEEDS_LIMIT = "power_exceeds_limit"
+    MASS_EXCEEDS_LIMIT = "mass_exceeds_limit"
+    STOWAGE_EXCEEDS_LIMIT = "stowage_exceeds_limit"
+
+
+class ModuleValidationError(str):
+    """
+    Validation error message tagged with a ModuleValidationCode.
+    
+    Subclasses str so existing callers can keep treating errors as messages.
+    """
+    code: ModuleValidationCode
+    
+    def __new__(cls, code: ModuleValidationCode, message: str):
+        error = super().__new__(cls, message)
+        error.code = code
+        return error
+
+
 class AssetReference(BaseModel):
     """Reference to a 3D asset file"""
     file_path: str = Field(..., description="Path to the 3D asset file")
@@ -73,9 +100,16 @@ class ModuleLibrary:
         self.assets_path = assets_path or Path("assets/modules")
         self.cache_ttl = timedelta(hours=cache_ttl_hours)
         self._modules: Dict[str, ModuleDefinition] = {}
+        self._type_index: frozenset = frozenset()
         self._cache_metadata: Optional[ModuleLibraryCache] = None
         self._initialized = False
         
+        # Running totals maintained on add/remove so stats never rescan modules
+        self._agg_mass = 0.0
+        self._agg_power = 0.0
+        self._agg_stowage = 0.0
+        self._type_counts: Dict[str, int] = {}
+        
         # Initialize with standard modules
         self._load_standard_modules()
     
@@ -363,10 +397,41 @@ class ModuleLibrary:
             self._modules[module.module_id] = module
         
         self._initialized = True
+        self._recompute_aggregates()
+        self._update_type_index()
         self._update_cache_metadata()
         
         logger.info(f"Loaded {len(modules)} standard modules into library")
     
+    def _recompute_aggregates(self):
+        """Rebuild the running mass/power/stowage totals and type counts from scratch"""
+        self._agg_mass = 0.0
+        self._agg_power = 0.0
+        self._agg_stowage = 0.0
+        self._type_counts = {}
+        for module in self._modules.values():
+            self._accumulate(module, 1)
+    
+    def _accumulate(self, module: ModuleDefinition, sign: int):
+        """Add (sign=1) or remove (sign=-1) a module's contribution to the running totals"""
+        self._agg_mass += sign * module.spec.mass_kg
+        self._agg_power += sign * module.spec.power_w
+        self._agg_stowage += sign * module.spec.stowage_m3
+        
+        if hasattr(module.module_type, 'value'):
+            module_type = module.module_type.value
+        else:
+            module_type = str(module.module_type)
+        count = self._type_counts.get(module_type, 0) + sign
+        if count > 0:
+            self._type_counts[module_type] = count
+        else:
+            self._type_counts.pop(module_type, None)
+    
+    def _update_type_index(self):
+        """Recompute the set of module types present in the library"""
+        self._type_index = frozenset(ModuleType(t) for t in self._type_counts)
+    
     def _update_cache_metadata(self):
         """Update cache metadata"""
         module_data = json.dumps([m.model_dump(mode='json') for m in self._modules.values()], sort_keys=True, default=str)
@@ -377,12 +442,19 @@ class ModuleLibrary:
             checksum=checksum
         )
     
+    @property
+    def checksum(self) -> Optional[str]:
+        """Content checksum of the module set; changes whenever modules are added or removed"""
+        return self._cache_metadata.checksum if self._cache_metadata else None
+    
     def get_module(self, module_id: str) -> Optional[ModuleDefinition]:
         """Get a module by ID"""
         return self._modules.get(module_id)
     
     def get_modules_by_type(self, module_type: ModuleType) -> List[ModuleDefinition]:
         """Get all modules of a specific type"""
+        if module_type not in self._type_index:
+            return []
         return [m for m in self._modules.values() if m.module_type == module_type]
     
     def get_all_modules(self) -> List[ModuleDefinition]:
@@ -438,12 +510,13 @@ class ModuleLibrary:
         
         return results
     
-    def validate_module(self, module: ModuleDefinition) -> List[str]:
+    def validate_module(self, module: ModuleDefinition) -> List[ModuleValidationError]:
         """
         Validate a module definition
         
         Returns:
-            List of validation error messages (empty if valid)
+            List of validation errors (empty if valid); each is the error
+            message string with a ModuleValidationCode in its ``code`` attribute
         """
         errors = []
         
@@ -451,13 +524,15 @@ class ModuleLibrary:
         try:
             module.spec.model_validate(module.spec.model_dump())
         except Exception as e:
-            errors.append(f"Module spec validation failed: {str(e)}")
+            errors.append(ModuleValidationError(
+                ModuleValidationCode.SPEC_INVALID, f"Module spec validation failed: {str(e)}"))
         
         # Asset validation
         if self.assets_path:
             asset_path = self.assets_path / module.asset.file_path
             if not asset_path.exists():
-                errors.append(f"Asset file not found: {module.asset.file_path}")
+                errors.append(ModuleValidationError(
+                    ModuleValidationCode.ASSET_NOT_FOUND, f"Asset file not found: {module.asset.file_path}"))
         
         # Custom validation rules
         validation_rules = module.validation_rules
@@ -465,23 +540,28 @@ class ModuleLibrary:
         # Check required connections for certain module types
         if module.module_type == ModuleType.AIRLOCK:
             if len(module.spec.connectivity_ports) < 2:
-                errors.append("Airlock modules must have at least 2 connectivity ports")
+                errors.append(ModuleValidationError(
+                    ModuleValidationCode.AIRLOCK_PORTS, "Airlock modules must have at least 2 connectivity ports"))
         
         if module.module_type == ModuleType.GALLEY:
             if validation_rules.get("requires_water_connection") and "port_service" not in module.spec.connectivity_ports:
-                errors.append("Galley modules require a service port for water connection")
+                errors.append(ModuleValidationError(
+                    ModuleValidationCode.GALLEY_SERVICE_PORT, "Galley modules require a service port for water connection"))
         
         # Check power requirements
         if module.spec.power_w > 5000:
-            errors.append("Module power consumption exceeds 5kW limit")
+            errors.append(ModuleValidationError(
+                ModuleValidationCode.POWER_EXCEEDS_LIMIT, "Module power consumption exceeds 5kW limit"))
         
         # Check mass limits
         if module.spec.mass_kg > 2000:
-            errors.append("Module mass exceeds 2000kg limit")
+            errors.append(ModuleValidationError(
+                ModuleValidationCode.MASS_EXCEEDS_LIMIT, "Module mass exceeds 2000kg limit"))
         
         # Check stowage volume vs bounding box
         if module.spec.stowage_m3 > module.spec.bbox_m.volume * 0.9:
-            errors.append("Stowage volume cannot exceed 90% of module bounding box")
+            errors.append(ModuleValidationError(
+                ModuleValidationCode.STOWAGE_EXCEEDS_LIMIT, "Stowage volume cannot exceed 90% of module bounding box"))
         
         return errors
     
@@ -503,6 +583,8 @@ class ModuleLibrary:
             return False
         
         self._modules[module.module_id] = module
+        self._accumulate(module, 1)
+        self._update_type_index()
         self._update_cache_metadata()
         
         logger.info(f"Added custom module: {module.module_id}")
@@ -515,7 +597,8 @@ class ModuleLibrary:
             return False
         
         if module_id in self._modules:
-            del self._modules[module_id]
+            self._accumulate(self._modules.pop(module_id), -1)
+            self._update_type_index()
             self._update_cache_metadata()
             logger.info(f"Removed module: {module_id}")
             return True
@@ -549,39 +632,26 @@ class ModuleLibrary:
     
     def get_library_stats(self) -> Dict[str, Any]:
         """Get library statistics"""
-        modules = list(self._modules.values())
-        
-        type_counts = {}
-        total_mass = 0
-        total_power = 0
-        total_stowage = 0
-        
-        for module in modules:
-            if hasattr(module.module_type, 'value'):
-                module_type = module.module_type.value
-            else:
-                module_type = str(module.module_type)
-            type_counts[module_type] = type_counts.get(module_type, 0) + 1
-            total_mass += module.spec.mass_kg
-            total_power += module.spec.power_w
-            total_stowage += module.spec.stowage_m3
-        
         return {
-            "total_modules": len(modules),
-            "module_types": type_counts,
-            "total_mass_kg": total_mass,
-            "total_power_w": total_power,
-            "total_stowage_m3": total_stowage,
+            "total_modules": len(self._modules),
+            "module_types": dict(self._type_counts),
+            "total_mass_kg": self._agg_mass,
+            "total_power_w": self._agg_power,
+            "total_stowage_m3": self._agg_stowage,
             "cache_metadata": self._cache_metadata.model_dump() if self._cache_metadata else None
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the library to a JSON-compatible dict (the export format)"""
+        return {
+            "metadata": self._cache_metadata.model_dump(mode='json') if self._cache_metadata else None,
+            "modules": [m.model_dump(mode='json') for m in self._modules.values()]
+        }
+    
     def export_library(self, file_path: Path) -> bool:
         """Export library to JSON file"""
         try:
-            export_data = {
-                "metadata": self._cache_metadata.model_dump(mode='json') if self._cache_metadata else None,
-                "modules": [m.model_dump(mode='json') for m in self._modules.values()]
-            }
+            export_data = self.to_dict()
             
             with open(file_path, 'w') as f:
                 json.dump(export_data, f, indent=2, default=str)
@@ -605,6 +675,9 @@ class ModuleLibrary:
                     k: v for k, v in self._modules.items() 
                     if k.startswith("std_")
                 }
+                self._recompute_aggregates()
+                self._update_type_index()
+                self._update_cache_metadata()
             
             # Import modules
             imported_count = 0
@@ -624,20 +697,37 @@ class ModuleLibrary:
             return False
 
 
-# Global module library instance
-_module_library: Optional[ModuleLibrary] = None
+# Global module library as (pid, settings, library). Only the current process's
+# library is kept; a forked worker sees a foreign pid and builds its own
+_global_library: Optional[Tuple[int, tuple, ModuleLibrary]] = None
+
+# Settings of a library created by get_module_library
+_DEFAULT_SETTINGS = (None, 24)
 
 
 def get_module_library() -> ModuleLibrary:
-    """Get the global module library instance"""
-    global _module_library
-    if _module_library is None:
-        _module_library = ModuleLibrary()
-    return _module_library
+    """Get the global module library instance for the current process"""
+    global _global_library
+    pid = os.getpid()
+    if _global_library is None or _global_library[0] != pid:
+        _global_library = (pid, _DEFAULT_SETTINGS, ModuleLibrary())
+    return _global_library[2]
 
 
-def initialize_module_library(assets_path: Optional[Path] = None, cache_ttl_hours: int = 24) -> ModuleLibrary:
-    """Initialize the global module library with custom settings"""
-    global _module_library
-    _module_library = ModuleLibrary(assets_path=assets_path, cache_ttl_hours=cache_ttl_hours)
-    return _module_library
\ No newline at end of file
+def initialize_module_library(assets_path: Optional[Path] = None, cache_ttl_hours: int = 24,
+                              reset: bool = False) -> ModuleLibrary:
+    """
+    Initialize the global module library with custom settings
+    
+    Re-initializing with the settings of the current global library returns
+    that same shared instance instead of reloading the standard modules;
+    other settings replace it. Pass reset=True to force a fresh library.
+    """
+    global _global_library
+    pid = os.getpid()
+    settings = (assets_path, cache_ttl_hours)
+    if (reset or _global_library is None or _global_library[0] != pid
+            or _global_library[1] != settings):
+        library = ModuleLibrary(assets_path=assets_path, cache_ttl_hours=cache_ttl_hours)
+        _global_library = (pid, settings, library)
+    return _global_library[2]
@@ -0,0 +1,43 @@
+"""
+Numeric kernels for the scoring engine's basic metric calculations.
+
+The kernels take flat NumPy arrays so they can be compiled with numba when it
+is installed; without numba they run as plain Python with identical results.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback that leaves the kernel as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def spec_totals(spec: np.ndarray):
+    """
+    Column sums of a per-module spec table in a single row-major pass.
+
+    NaN entries (modules with no definition) are skipped and counted instead,
+    so callers can substitute their own per-column defaults. Returns the
+    (C,) float64 sums and the (C,) int64 missing counts.
+    """
+    n_rows, n_cols = spec.shape
+    sums = np.zeros(n_cols)
+    missing = np.zeros(n_cols, dtype=np.int64)
+    for i in range(n_rows):
+        for j in range(n_cols):
+            value = spec[i, j]
+            if np.isnan(value):
+                missing[j] += 1
+            else:
+                sums[j] += value
+
+    return sums, missing
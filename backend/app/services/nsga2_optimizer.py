@@ -9,19 +9,31 @@ and safety objectives.
 import numpy as np
 import logging
 from typing import List, Dict, Tuple, Optional, Any, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import uuid
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback that leaves the kernel as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
+
 from pymoo.algorithms.moo.nsga2 import NSGA2
 from pymoo.core.problem import Problem
 from pymoo.operators.crossover.sbx import SBX
 from pymoo.operators.mutation.pm import PM
-from pymoo.operators.sampling.rnd import FloatRandomSampling
 from pymoo.optimize import minimize
 from pymoo.core.result import Result
+from pymoo.indicators.hv import HV
 
 from app.models.base import (
     EnvelopeSpec, MissionParameters, LayoutSpec, ModulePlacement, 
@@ -30,7 +42,7 @@ from app.models.base import (
 from app.models.module_library import get_module_library, ModuleDefinition
 from app.services.collision_detector import CollisionDetector
 from app.services.connectivity_validator import ConnectivityValidator
-from app.services.scoring_engine import EnhancedScoringEngine
+from app.services.scoring_engine import EnhancedScoringEngine, ScoringError
 from app.services.layout_grammar import create_layout_grammar
 
 logger = logging.getLogger(__name__)
@@ -58,8 +70,23 @@ class OptimizationConfig:
     mutation_eta: float = 20.0
     objectives: List[OptimizationObjective] = None
     objective_weights: Dict[OptimizationObjective, float] = None
+    random_seed: Optional[int] = None
+    hypervolume_interval: int = 10
     
     def __post_init__(self):
+        if self.population_size <= 0:
+            raise ValueError(f"population_size must be positive, got {self.population_size}")
+        if self.generations <= 0:
+            raise ValueError(f"generations must be positive, got {self.generations}")
+        if not 0.0 <= self.crossover_prob <= 1.0:
+            raise ValueError(f"crossover_prob must be in [0, 1], got {self.crossover_prob}")
+        if not 0.0 <= self.mutation_prob <= 1.0:
+            raise ValueError(f"mutation_prob must be in [0, 1], got {self.mutation_prob}")
+        if self.hypervolume_interval <= 0:
+            raise ValueError(
+                f"hypervolume_interval must be positive, got {self.hypervolume_interval}"
+            )
+        
         if self.objectives is None:
             self.objectives = [
                 OptimizationObjective.TRANSIT_TIME,
@@ -74,16 +101,103 @@ class OptimizationConfig:
             self.objective_weights = {obj: weight for obj in self.objectives}
 
 
+def _kpis_to_matrix(layouts: List[LayoutSpec]) -> np.ndarray:
+    """
+    Minimization view of layout KPIs as an (N, 5) C-contiguous float64 array:
+    transit time, egress time, mass, negated thermal margin, negated LSS margin.
+    """
+    values = (
+        value
+        for layout in layouts
+        for value in (
+            layout.kpis.mean_transit_time,
+            layout.kpis.egress_time,
+            layout.kpis.mass_total,
+            -layout.kpis.thermal_margin,
+            -layout.kpis.lss_margin
+        )
+    )
+    return np.fromiter(values, dtype=np.float64, count=5 * len(layouts)).reshape(-1, 5)
+
+
 @dataclass
 class OptimizationResult:
     """Result of NSGA-II optimization"""
     pareto_layouts: List[LayoutSpec]
     best_layout: LayoutSpec
+    # Hypervolume of the non-dominated set per recorded generation (higher is
+    # better). Every generation for two objectives; otherwise every
+    # config.hypervolume_interval generations plus the last one
     convergence_history: List[float]
     generation_count: int
     evaluation_count: int
     optimization_time: float
     config: OptimizationConfig
+    # Objective rows NSGA-II ranked for each Pareto layout, in config.objectives
+    # order with constraint penalties included
+    pareto_fitness: np.ndarray = field(repr=False)
+    # Candidate evaluations penalized because the scoring engine returned
+    # non-finite metrics
+    non_finite_evaluations: int = 0
+    pareto_objectives: np.ndarray = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.pareto_fitness = np.ascontiguousarray(self.pareto_fitness, dtype=np.float64)
+        self.pareto_objectives = _kpis_to_matrix(self.pareto_layouts)
+
+
+# Envelope kinds understood by the bounds kernel
+_BOUNDS_UNCHECKED = 0
+_BOUNDS_CYLINDER = 1
+_BOUNDS_BOX = 2
+
+
+@njit(cache=True)
+def _count_bounds_violations(
+    positions: np.ndarray,
+    half_extents: np.ndarray,
+    envelope_kind: int,
+    limits: np.ndarray
+) -> int:
+    """
+    Count modules that extend past the envelope.
+    
+    positions and half_extents are (N, 3) float64 arrays. For a cylinder,
+    limits holds (radius, half length, unused); for a box, the half width,
+    half height and half depth.
+    """
+    if envelope_kind == _BOUNDS_UNCHECKED:
+        return 0
+    
+    violations = 0
+    for i in range(positions.shape[0]):
+        x, y, z = positions[i, 0], positions[i, 1], positions[i, 2]
+        hx, hy, hz = half_extents[i, 0], half_extents[i, 1], half_extents[i, 2]
+        
+        if envelope_kind == _BOUNDS_CYLINDER:
+            if (np.sqrt(x * x + y * y) + max(hx, hy) > limits[0] or
+                    abs(z) + hz > limits[1]):
+                violations += 1
+        elif (abs(x) + hx > limits[0] or
+                abs(y) + hy > limits[1] or
+                abs(z) + hz > limits[2]):
+            violations += 1
+    
+    return violations
+
+
+def _hypervolume_2d(front: np.ndarray, ref_point: np.ndarray) -> float:
+    """Exact 2-objective hypervolume by sorting on the first objective and sweeping"""
+    front = front[(front < ref_point).all(axis=1)]
+    if len(front) == 0:
+        return 0.0
+    
+    order = np.argsort(front[:, 0], kind="stable")
+    f0 = front[order, 0]
+    f1 = np.minimum.accumulate(front[order, 1])
+    previous_f1 = np.concatenate(([ref_point[1]], f1[:-1]))
+    
+    return float(np.sum((ref_point[0] - f0) * (previous_f1 - f1)))
 
 
 class HabitatLayoutProblem(Problem):
@@ -112,9 +226,22 @@ class HabitatLayoutProblem(Problem):
         self.scoring_engine = EnhancedScoringEngine()
         self.layout_grammar = create_layout_grammar()
         
+        # Candidates whose metrics came back non-finite, reported on the result
+        self.non_finite_evaluations = 0
+        
         # Calculate decision variable bounds
         self.placement_bounds = self._calculate_placement_bounds()
         
+        # Dense inputs for the bounds kernel, built once per problem
+        self._module_half_extents = np.array(
+            [
+                [m.spec.bbox_m.x / 2, m.spec.bbox_m.y / 2, m.spec.bbox_m.z / 2]
+                for m in required_modules
+            ],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        self._bounds_kind, self._bounds_limits = self._envelope_bounds_limits()
+        
         # Each module has 4 decision variables: x, y, z, rotation
         n_vars = len(required_modules) * 4
         n_obj = len(config.objectives)
@@ -194,6 +321,22 @@ class HabitatLayoutProblem(Problem):
                 'min_z': -5.0, 'max_z': 5.0
             }
     
+    def _envelope_bounds_limits(self) -> Tuple[int, np.ndarray]:
+        """Envelope kind and limits passed to the bounds kernel"""
+        envelope_type = self.envelope.type if isinstance(self.envelope.type, str) else self.envelope.type.value
+        params = self.envelope.params
+        
+        if envelope_type == "cylinder":
+            limits = [params['radius'], params['length'] / 2, 0.0]
+            return _BOUNDS_CYLINDER, np.array(limits, dtype=np.float64)
+        
+        if envelope_type == "box":
+            limits = [params['width'] / 2, params['height'] / 2, params['depth'] / 2]
+            return _BOUNDS_BOX, np.array(limits, dtype=np.float64)
+        
+        # For other envelope types, assume valid for now
+        return _BOUNDS_UNCHECKED, np.zeros(3, dtype=np.float64)
+    
     def _decode_solution(self, x: np.ndarray) -> List[ModulePlacement]:
         """Convert decision variables to module placements"""
         placements = []
@@ -284,6 +427,13 @@ class HabitatLayoutProblem(Problem):
             
             return objectives, penalty
         
+        except ScoringError as e:
+            # Penalized like a failed evaluation, but counted so the run can report
+            # how much of the search space the scoring engine could not handle
+            self.non_finite_evaluations += 1
+            logger.debug(f"Non-finite metrics for candidate layout: {str(e)}")
+            return np.full(len(self.config.objectives), 1e6), 1e6
+        
         except Exception as e:
             logger.warning(f"Error evaluating objectives: {str(e)}")
             # Return high penalty for failed evaluations
@@ -313,11 +463,12 @@ class HabitatLayoutProblem(Problem):
                 penalty += 500  # Moderate penalty for connectivity issues
             
             # Check envelope bounds
-            bounds_violations = 0
-            for i, placement in enumerate(placements):
-                module_def = self.required_modules[i]
-                if not self._is_within_envelope_bounds(placement, module_def):
-                    bounds_violations += 1
+            positions = np.array(
+                [placement.position for placement in placements], dtype=np.float64
+            ).reshape(-1, 3)
+            bounds_violations = _count_bounds_violations(
+                positions, self._module_half_extents, self._bounds_kind, self._bounds_limits
+            )
             
             penalty += bounds_violations * 200
             
@@ -341,46 +492,6 @@ class HabitatLayoutProblem(Problem):
             logger.warning(f"Error calculating constraint penalty: {str(e)}")
             return 1000  # High penalty for evaluation errors
     
-    def _is_within_envelope_bounds(
-        self, 
-        placement: ModulePlacement, 
-        module_def: ModuleDefinition
-    ) -> bool:
-        """Check if module placement is within envelope bounds"""
-        bbox = module_def.spec.bbox_m
-        pos = placement.position
-        
-        envelope_type = self.envelope.type if isinstance(self.envelope.type, str) else self.envelope.type.value
-        if envelope_type == "cylinder":
-            radius = self.envelope.params['radius']
-            length = self.envelope.params['length']
-            
-            # Check radial constraint
-            module_radius = np.sqrt(pos[0]**2 + pos[1]**2) + max(bbox.x, bbox.y) / 2
-            if module_radius > radius:
-                return False
-            
-            # Check length constraint
-            if abs(pos[2]) + bbox.z / 2 > length / 2:
-                return False
-            
-            return True
-        
-        elif envelope_type == "box":
-            width = self.envelope.params['width']
-            height = self.envelope.params['height']
-            depth = self.envelope.params['depth']
-            
-            if (abs(pos[0]) + bbox.x/2 > width/2 or
-                abs(pos[1]) + bbox.y/2 > height/2 or
-                abs(pos[2]) + bbox.z/2 > depth/2):
-                return False
-            
-            return True
-        
-        # For other envelope types, assume valid for now
-        return True
-    
     def _evaluate(self, x, out, *args, **kwargs):
         """Pymoo evaluation function"""
         n_solutions = x.shape[0]
@@ -405,11 +516,21 @@ class NSGA2Optimizer:
     
     def __init__(self, config: OptimizationConfig = None):
         self.config = config or OptimizationConfig()
-        self.module_library = get_module_library()
+        self._module_library = None
+        
+        # Single random stream for initial populations; reproducible when seeded
+        self._rng = np.random.default_rng(np.random.SeedSequence(self.config.random_seed))
         
         # Thread pool for parallel evaluation
         self.executor = ThreadPoolExecutor(max_workers=4)
     
+    @property
+    def module_library(self):
+        """Module library, resolved on first use rather than at construction"""
+        if self._module_library is None:
+            self._module_library = get_module_library()
+        return self._module_library
+    
     async def optimize_layout(
         self,
         envelope: EnvelopeSpec,
@@ -425,7 +546,8 @@ class NSGA2Optimizer:
             required_modules: List of required modules (auto-selected if None)
             
         Returns:
-            OptimizationResult containing Pareto-optimal layouts
+            OptimizationResult containing Pareto-optimal layouts; its
+            convergence_history holds hypervolumes, not objective means
         """
         logger.info(f"Starting NSGA-II optimization for envelope {envelope.id}")
         
@@ -443,7 +565,7 @@ class NSGA2Optimizer:
         # Configure NSGA-II algorithm
         algorithm = NSGA2(
             pop_size=self.config.population_size,
-            sampling=FloatRandomSampling(),
+            sampling=self._sample_population(problem),
             crossover=SBX(prob=self.config.crossover_prob, eta=self.config.crossover_eta),
             mutation=PM(prob=self.config.mutation_prob, eta=self.config.mutation_eta),
             eliminate_duplicates=True
@@ -465,7 +587,7 @@ class NSGA2Optimizer:
             optimization_time = time.time() - start_time
             
             # Convert results to layout specifications
-            pareto_layouts = await self._convert_results_to_layouts(
+            pareto_layouts, pareto_fitness = await self._convert_results_to_layouts(
                 result, problem, envelope, mission_params
             )
             
@@ -482,9 +604,17 @@ class NSGA2Optimizer:
                 generation_count=self.config.generations,
                 evaluation_count=result.algorithm.evaluator.n_eval,
                 optimization_time=optimization_time,
-                config=self.config
+                config=self.config,
+                pareto_fitness=pareto_fitness,
+                non_finite_evaluations=problem.non_finite_evaluations
             )
             
+            if problem.non_finite_evaluations:
+                logger.warning(
+                    f"{problem.non_finite_evaluations} candidate evaluations returned "
+                    f"non-finite metrics and were penalized"
+                )
+            
             logger.info(
                 f"Optimization completed in {optimization_time:.2f}s, "
                 f"found {len(pareto_layouts)} Pareto-optimal solutions"
@@ -496,6 +626,33 @@ class NSGA2Optimizer:
             logger.error(f"Optimization failed: {str(e)}")
             raise
     
+    def sample_initial_population(
+        self,
+        envelope: EnvelopeSpec,
+        mission_params: MissionParameters,
+        required_modules: List[ModuleDefinition] = None
+    ) -> np.ndarray:
+        """
+        Draw the initial population used by optimize_layout.
+        
+        Returns a (population_size, n_var) array of decision variables within
+        the problem bounds. Two optimizers built with the same random_seed
+        return identical arrays on their first call.
+        """
+        if required_modules is None:
+            required_modules = self._select_required_modules(mission_params)
+        
+        problem = HabitatLayoutProblem(
+            envelope, mission_params, required_modules, self.config
+        )
+        return self._sample_population(problem)
+    
+    def _sample_population(self, problem: HabitatLayoutProblem) -> np.ndarray:
+        """Uniform sample of the decision space from the optimizer's random stream"""
+        return self._rng.uniform(
+            problem.xl, problem.xu, size=(self.config.population_size, problem.n_var)
+        )
+    
     def _run_optimization(self, problem: HabitatLayoutProblem, algorithm: NSGA2) -> Result:
         """Run the optimization algorithm (blocking operation)"""
         termination = ('n_gen', self.config.generations)
@@ -504,6 +661,7 @@ class NSGA2Optimizer:
             problem,
             algorithm,
             termination,
+            seed=self.config.random_seed,
             verbose=False,
             save_history=True
         )
@@ -516,9 +674,15 @@ class NSGA2Optimizer:
         problem: HabitatLayoutProblem,
         envelope: EnvelopeSpec,
         mission_params: MissionParameters
-    ) -> List[LayoutSpec]:
-        """Convert optimization results to LayoutSpec objects"""
+    ) -> Tuple[List[LayoutSpec], np.ndarray]:
+        """
+        Convert optimization results to LayoutSpec objects.
+        
+        Returns the layouts together with the objective rows of the solutions
+        that converted, so both stay aligned when a solution is skipped.
+        """
         layouts = []
+        converted = []
         
         # Get Pareto-optimal solutions
         pareto_solutions = result.X
@@ -562,12 +726,14 @@ class NSGA2Optimizer:
                 )
                 
                 layouts.append(layout)
+                converted.append(i)
             
             except Exception as e:
                 logger.warning(f"Failed to convert solution {i} to layout: {str(e)}")
                 continue
         
-        return layouts
+        fitness = np.asarray(pareto_objectives, dtype=np.float64).reshape(len(pareto_solutions), -1)
+        return layouts, fitness[converted]
     
     def _select_best_layout(
         self, 
@@ -578,18 +744,15 @@ class NSGA2Optimizer:
         if not layouts:
             raise ValueError("No valid layouts to select from")
         
-        best_layout = layouts[0]
-        best_score = float('-inf')
-        
-        for layout in layouts:
-            # Calculate weighted score based on mission priorities
-            score = self._calculate_weighted_score(layout.kpis, mission_params)
-            
-            if score > best_score:
-                best_score = score
-                best_layout = layout
+        # Weighted score per layout based on mission priorities; argmax keeps
+        # the first layout on ties
+        scores = np.fromiter(
+            (self._calculate_weighted_score(layout.kpis, mission_params) for layout in layouts),
+            dtype=np.float64,
+            count=len(layouts)
+        )
         
-        return best_layout
+        return layouts[int(np.argmax(scores))]
     
     def _calculate_weighted_score(
         self, 
@@ -620,21 +783,46 @@ class NSGA2Optimizer:
         return score
     
     def _extract_convergence_history(self, result: Result) -> List[float]:
-        """Extract convergence history from optimization result"""
+        """
+        Hypervolume of each generation's non-dominated set, against one
+        reference point for the whole run.
+        
+        Two-objective runs are measured every generation with the exact
+        sweep. Exact hypervolume grows steeply with the objective count, so
+        other runs are sampled every config.hypervolume_interval generations,
+        always including the last.
+        """
         if not hasattr(result, 'history') or not result.history:
             return []
         
-        convergence = []
+        fronts = []
         for generation in result.history:
             if hasattr(generation, 'opt') and generation.opt is not None:
-                # Use hypervolume or average objective as convergence metric
                 objectives = generation.opt.get("F")
                 if objectives is not None and len(objectives) > 0:
-                    # Use average of first objective as convergence metric
-                    avg_objective = np.mean(objectives[:, 0])
-                    convergence.append(float(avg_objective))
+                    fronts.append(np.asarray(objectives, dtype=np.float64))
+        
+        if not fronts:
+            return []
+        
+        # One reference point for the whole run, just past the worst value seen
+        # for each objective, so the per-generation hypervolumes are comparable
+        all_objectives = np.vstack(fronts)
+        worst = all_objectives.max(axis=0)
+        spread = worst - all_objectives.min(axis=0)
+        ref_point = worst + 0.1 * spread + 1e-9
+        
+        if ref_point.shape[0] == 2:
+            return [_hypervolume_2d(front, ref_point) for front in fronts]
+        
+        last = len(fronts) - 1
+        sampled = [
+            front for index, front in enumerate(fronts)
+            if index % self.config.hypervolume_interval == 0 or index == last
+        ]
         
-        return convergence
+        indicator = HV(ref_point=ref_point)
+        return [float(indicator(front)) for front in sampled]
     
     def _select_required_modules(self, mission_params: MissionParameters) -> List[ModuleDefinition]:
         """Select required modules based on mission parameters"""
@@ -6,10 +6,17 @@ It integrates human factors analysis, life support systems modeling, and power/t
 analysis to provide detailed performance assessments.
 """
 
+import hashlib
 import math
+import pickle
 from typing import List, Dict, Tuple, Optional, Set
 import logging
-from collections import defaultdict, deque
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from scipy.spatial.distance import cdist
 
 from app.models.base import (
     ModulePlacement, PerformanceMetrics, EnvelopeSpec, MissionParameters, ModuleType
@@ -18,10 +25,47 @@ from app.models.module_library import get_module_library, ModuleDefinition
 from app.services.human_factors_analyzer import HumanFactorsAnalyzer
 from app.services.lss_model import LSSModel, AtmosphereComposition
 from app.services.power_thermal_analyzer import PowerThermalAnalyzer
+from app.services import _scoring_kernels
 
 logger = logging.getLogger(__name__)
 
 
+class ScoringError(Exception):
+    """Exception raised when a layout cannot be scored to finite metrics"""
+    pass
+
+# Columns of the per-module spec table built by _module_spec_table
+_SPEC_MASS_KG = 0
+_SPEC_POWER_W = 1
+_SPEC_STOWAGE_M3 = 2
+_SPEC_VOLUME_M3 = 3
+_SPEC_COLUMNS = 4
+
+# Integer codes for ModuleType, as stored in _LayoutArrays.types
+_MODULE_TYPE_CODES = {module_type.value: code for code, module_type in enumerate(ModuleType)}
+
+
+@dataclass
+class _LayoutArrays:
+    """Structure-of-arrays view of a layout, built once per basic metrics pass"""
+    positions: np.ndarray  # (N, 3) float64
+    types: np.ndarray  # (N,) int8 codes from _MODULE_TYPE_CODES
+    distances: np.ndarray  # (N, N) straight-line distances
+    edge_rows: np.ndarray  # proximity graph edges, upper triangle only
+    edge_cols: np.ndarray
+    edge_weights: np.ndarray
+    adjacency: csr_matrix  # symmetric proximity graph, weighted by straight-line distance
+    component_count: int  # connected components of the proximity graph
+    spec: np.ndarray  # (N, _SPEC_COLUMNS), NaN where no module definition exists
+    spec_sums: np.ndarray  # (_SPEC_COLUMNS,) column totals of spec, NaN skipped
+    spec_missing: np.ndarray  # (_SPEC_COLUMNS,) NaN count per spec column
+    topology_key: bytes
+    
+    def count(self, module_type: ModuleType) -> int:
+        """Number of modules of the given type"""
+        return int(np.count_nonzero(self.types == _MODULE_TYPE_CODES[module_type.value]))
+
+
 class EnhancedScoringEngine:
     """
     Enhanced scoring engine that calculates comprehensive performance metrics for habitat layouts.
@@ -42,6 +86,28 @@ class EnhancedScoringEngine:
         self.crew_walking_speed = 1.2  # m/s
         self.corridor_width = 1.0  # meters
         self.emergency_speed_factor = 1.5  # multiplier for emergency movement
+        self.max_connection_distance = 5.0  # meters
+        self.base_power_per_crew = 200.0  # watts per crew member (lighting, ventilation, etc.)
+        self.crew_heat_generation = 80.0  # watts of metabolic heat per crew member
+        self.base_thermal_load = 500.0  # watts from avionics and environmental control
+        self.oxygen_consumption_per_crew = 0.84  # kg O2 per crew member per day
+        self.co2_production_per_crew = 1.04  # kg CO2 per crew member per day
+        self.water_consumption_per_crew = 3.52  # kg H2O per crew member per day
+        
+        # Memoized metrics keyed on a content hash of the layout and mission (FIFO-bounded);
+        # PerformanceMetrics is frozen, so cache hits hand back the stored instance
+        self.metrics_cache_size = 256
+        self._metrics_cache: Dict[bytes, PerformanceMetrics] = {}
+        
+        # Array views of recently scored layouts, keyed on module ids, types and positions
+        self._layout_cache: Dict[Tuple, _LayoutArrays] = {}
+        
+        # Library checksum the two caches above were filled under; both hold
+        # values resolved from module definitions, so a library change drops them
+        self._library_checksum = self.module_library.checksum
+        
+        # All-pairs shortest path matrices keyed on a hash of the layout topology
+        self._apsp_cache: Dict[bytes, np.ndarray] = {}
     
     async def calculate_metrics(
         self,
@@ -59,7 +125,97 @@ class EnhancedScoringEngine:
             
         Returns:
             Computed performance metrics
+            
+        Raises:
+            ScoringError: If any core metric comes out NaN or infinite
+        """
+        self._check_library_unchanged()
+        key = self._metrics_cache_key(modules, envelope, mission_params)
+        cached = self._metrics_cache.get(key)
+        if cached is None:
+            cached = await self._compute_metrics(modules, envelope, mission_params)
+            self._check_finite(cached)
+            if len(self._metrics_cache) >= self.metrics_cache_size:
+                self._metrics_cache.pop(next(iter(self._metrics_cache)), None)
+            self._metrics_cache[key] = cached
+        
+        return cached
+    
+    def _check_library_unchanged(self) -> None:
+        """Drop cached metrics and spec tables if module definitions changed since they were built"""
+        checksum = self.module_library.checksum
+        if checksum != self._library_checksum:
+            self._metrics_cache.clear()
+            self._layout_cache.clear()
+            self._library_checksum = checksum
+    
+    @staticmethod
+    def _clamp_metric(name: str, value: float, low: float = -math.inf, high: float = math.inf) -> float:
+        """
+        Clamp an analyzer value into its metric range.
+        
+        Small overshoots are clamped quietly. A value more than ten times the
+        bound it overshoots points at broken inputs or an analyzer fault
+        rather than an extreme mission, so it is logged before clamping.
+        """
+        if value > 10 * high or value < 10 * low:
+            logger.warning(
+                f"{name}={value:.3g} is more than an order of magnitude outside "
+                f"[{low}, {high}], clamping"
+            )
+        return max(low, min(high, value))
+    
+    def _check_finite(self, metrics: PerformanceMetrics) -> None:
         """
+        Reject metrics with NaN or infinite values before they are cached.
+        
+        Disconnected layouts are scored with finite path penalties, so no
+        metric has a legitimate reason to be infinite.
+        """
+        core = np.array([
+            metrics.mean_transit_time,
+            metrics.egress_time,
+            metrics.mass_total,
+            metrics.power_budget,
+            metrics.thermal_margin,
+            metrics.lss_margin,
+            metrics.stowage_utilization
+        ], dtype=np.float64)
+        if not np.isfinite(core).all():
+            raise ScoringError(f"non-finite metric from overflow or invalid arithmetic: {metrics.model_dump()}")
+    
+    def _metrics_cache_key(
+        self,
+        modules: List[ModulePlacement],
+        envelope: EnvelopeSpec,
+        mission_params: MissionParameters
+    ) -> bytes:
+        """Content hash of everything calculate_metrics reads from its inputs"""
+        envelope_type = envelope.type if isinstance(envelope.type, str) else envelope.type.value
+        canonical = (
+            tuple(
+                (
+                    m.module_id,
+                    m.type if isinstance(m.type, str) else m.type.value,
+                    tuple(m.position),
+                    m.rotation_deg,
+                    tuple(sorted(m.connections)),
+                )
+                for m in modules
+            ),
+            envelope_type,
+            tuple(sorted(envelope.params.items())),
+            mission_params.model_dump_json(),
+        )
+        return hashlib.blake2b(pickle.dumps(canonical, protocol=pickle.HIGHEST_PROTOCOL)).digest()
+    
+    async def _compute_metrics(
+        self,
+        modules: List[ModulePlacement],
+        envelope: EnvelopeSpec,
+        mission_params: MissionParameters
+    ) -> PerformanceMetrics:
+        """Uncached body of calculate_metrics"""
         logger.info(f"Calculating enhanced metrics for layout with {len(modules)} modules")
         
         try:
@@ -83,7 +239,8 @@ class EnhancedScoringEngine:
             egress_time = human_factors_metrics.egress_analysis.max_egress_time
             
             # Calculate mass budget
-            mass_total = self._calculate_total_mass(modules)
+            layout = self._to_soa(modules)
+            mass_total = self._calculate_total_mass(layout)
             mass_total += lss_analysis.total_mass_kg  # Add LSS equipment mass
             mass_total += power_thermal_analysis.power_budget.total_generation_capacity_w * 0.01  # Rough power system mass
             
@@ -97,13 +254,19 @@ class EnhancedScoringEngine:
             # Use human factors stowage analysis
             stowage_utilization = human_factors_metrics.stowage_analysis.utilization_ratio
             
+            # Extreme missions can push the analyses past the PerformanceMetrics ranges;
+            # clamp to the same floors and ceilings the basic calculations use
+            thermal_margin = self._clamp_metric("thermal_margin", thermal_margin, -0.5, 1.0)
+            lss_margin = self._clamp_metric("lss_margin", lss_margin, -0.2, 1.0)
+            stowage_utilization = self._clamp_metric("stowage_utilization", stowage_utilization, high=2.0)
+            
             # Calculate additional scores using enhanced data
             connectivity_score = self._calculate_enhanced_connectivity_score(human_factors_metrics)
             safety_score = self._calculate_enhanced_safety_score(
                 human_factors_metrics, lss_analysis, power_thermal_analysis
             )
             efficiency_score = human_factors_metrics.overall_human_factors_score
-            volume_utilization = self._calculate_volume_utilization(modules, envelope)
+            volume_utilization = self._calculate_volume_utilization(layout, envelope)
             
             return PerformanceMetrics(
                 mean_transit_time=mean_transit_time,
@@ -124,139 +287,169 @@ class EnhancedScoringEngine:
             # Fallback to basic calculations if enhanced analysis fails
             return await self._calculate_basic_metrics(modules, envelope, mission_params)
     
-    def _build_connectivity_graph(self, modules: List[ModulePlacement]) -> Dict[str, Dict[str, float]]:
-        """Build a graph representing module connectivity"""
-        # Simple adjacency list representation: {node_id: {neighbor_id: distance}}
-        graph = {}
-        
-        # Initialize all nodes
-        for module in modules:
-            graph[module.module_id] = {}
+    def _to_soa(self, modules: List[ModulePlacement]) -> _LayoutArrays:
+        """
+        Convert placements to the structure-of-arrays form the basic metrics read from.
+        
+        The distance matrix comes from one cdist call on the (N, 3) position
+        array, and the proximity graph is emitted once as CSR. Views are cached
+        on the module ids, types and positions, so rescoring the same topology
+        (the enhanced path's mass pass, a repeated layout, a mission sweep)
+        reuses the arrays instead of rebuilding them. The cache is dropped
+        whenever the module library's contents change.
+        """
+        self._check_library_unchanged()
+        key = tuple((m.module_id, getattr(m.type, 'value', m.type), tuple(m.position)) for m in modules)
+        layout = self._layout_cache.get(key)
+        if layout is not None:
+            return layout
+        
+        n = len(modules)
+        module_ids = [entry[0] for entry in key]
+        positions = np.asarray([entry[2] for entry in key], dtype=np.float64).reshape(n, 3)
+        types = np.fromiter((_MODULE_TYPE_CODES[entry[1]] for entry in key), dtype=np.int8, count=n)
+        
+        distances = cdist(positions, positions)
+        rows, cols = np.nonzero(np.triu(distances <= self.max_connection_distance, k=1))
+        weights = distances[rows, cols]
+        # Built from explicit entries so zero-length edges between coincident modules survive
+        adjacency = csr_matrix(
+            (np.concatenate([weights, weights]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+            shape=(n, n)
+        )
         
-        # Add edges based on proximity (simplified connectivity model)
-        for i, module_a in enumerate(modules):
-            for module_b in modules[i+1:]:
-                distance = self._calculate_distance(module_a.position, module_b.position)
-                
-                # Connect modules if they're within reasonable distance
-                # This is a simplified model - real connectivity would consider actual pathways
-                max_connection_distance = 5.0  # meters
-                if distance <= max_connection_distance:
-                    graph[module_a.module_id][module_b.module_id] = distance
-                    graph[module_b.module_id][module_a.module_id] = distance
-        
-        return graph
+        digest = hashlib.blake2b()
+        digest.update(pickle.dumps(tuple(module_ids)))
+        digest.update(rows.tobytes())
+        digest.update(cols.tobytes())
+        digest.update(distances.tobytes())
+        
+        spec = self._module_spec_table(module_ids)
+        spec_sums, spec_missing = _scoring_kernels.spec_totals(spec)
+        layout = _LayoutArrays(
+            positions=positions,
+            types=types,
+            distances=distances,
+            edge_rows=rows,
+            edge_cols=cols,
+            edge_weights=weights,
+            adjacency=adjacency,
+            component_count=connected_components(adjacency, directed=False, return_labels=False),
+            spec=spec,
+            spec_sums=spec_sums,
+            spec_missing=spec_missing,
+            topology_key=digest.digest(),
+        )
+        if len(self._layout_cache) >= self.metrics_cache_size:
+            self._layout_cache.pop(next(iter(self._layout_cache)), None)
+        self._layout_cache[key] = layout
+        return layout
     
-    def _calculate_distance(self, pos1: List[float], pos2: List[float]) -> float:
-        """Calculate Euclidean distance between two positions"""
-        return math.sqrt(sum((a - b) ** 2 for a, b in zip(pos1, pos2)))
+    def _shortest_path_matrix(self, layout: _LayoutArrays) -> np.ndarray:
+        """
+        All-pairs shortest path distances over the proximity graph.
+        
+        Entries are np.inf where no path exists. The matrix is cached on the
+        layout's topology key (module ids, edges and positions), so the
+        transit, egress and connectivity calculations share a single pass.
+        """
+        n = len(layout.positions)
+        if layout.component_count == n:
+            # No edges at all: every pair is unreachable, nothing to solve
+            shortest = np.full((n, n), np.inf)
+            np.fill_diagonal(shortest, 0.0)
+            return shortest
+        
+        shortest = self._apsp_cache.get(layout.topology_key)
+        if shortest is None:
+            # One batched multi-source Dijkstra; the proximity graph is sparse, so this beats Floyd-Warshall
+            shortest = dijkstra(layout.adjacency, directed=False)
+            if len(self._apsp_cache) >= self.metrics_cache_size:
+                self._apsp_cache.pop(next(iter(self._apsp_cache)), None)
+            self._apsp_cache[layout.topology_key] = shortest
+        return shortest
     
-    def _calculate_mean_transit_time(
-        self, 
-        modules: List[ModulePlacement], 
-        graph: Dict[str, Dict[str, float]]
-    ) -> float:
+    def _calculate_mean_transit_time(self, layout: _LayoutArrays) -> float:
         """Calculate mean transit time between all module pairs"""
-        if len(modules) < 2:
+        n = len(layout.positions)
+        if n < 2:
             return 0.0
         
-        total_time = 0.0
-        path_count = 0
+        upper = np.triu_indices(n, k=1)
+        path_distances = self._shortest_path_matrix(layout)[upper]
         
-        # Calculate shortest path times between all pairs
-        for i, module_a in enumerate(modules):
-            for module_b in modules[i+1:]:
-                # Find shortest path using simple BFS
-                path_distance = self._find_shortest_path_distance(
-                    graph, module_a.module_id, module_b.module_id
-                )
-                
-                if path_distance is not None:
-                    # Convert to time (distance / speed)
-                    transit_time = path_distance / self.crew_walking_speed
-                    total_time += transit_time
-                    path_count += 1
-                else:
-                    # If no path exists, use direct distance as penalty
-                    direct_distance = self._calculate_distance(module_a.position, module_b.position)
-                    penalty_time = direct_distance / self.crew_walking_speed * 2  # Penalty factor
-                    total_time += penalty_time
-                    path_count += 1
-        
-        return total_time / path_count if path_count > 0 else 0.0
+        # Convert to time (distance / speed); if no path exists, use direct distance as penalty
+        transit_times = np.where(
+            np.isfinite(path_distances),
+            path_distances / self.crew_walking_speed,
+            layout.distances[upper] / self.crew_walking_speed * 2  # Penalty factor
+        )
+        
+        return float(transit_times.mean())
     
-    def _calculate_egress_time(
-        self, 
-        modules: List[ModulePlacement], 
-        graph: Dict[str, Dict[str, float]]
-    ) -> float:
+    def _calculate_egress_time(self, layout: _LayoutArrays) -> float:
         """Calculate maximum emergency egress time to nearest airlock"""
         # Find all airlocks
-        airlocks = [m for m in modules if m.type == ModuleType.AIRLOCK]
+        is_airlock = layout.types == _MODULE_TYPE_CODES[ModuleType.AIRLOCK.value]
         
-        if not airlocks:
+        if not is_airlock.any():
             # No airlocks - critical safety issue
             return 999.0  # Very high penalty time
         
-        max_egress_time = 0.0
+        if is_airlock.all():
+            return 0.0
         
-        # For each non-airlock module, find time to nearest airlock
-        for module in modules:
-            if module.type == ModuleType.AIRLOCK:
-                continue  # Skip airlocks themselves
-            
-            min_time_to_airlock = float('inf')
-            
-            for airlock in airlocks:
-                # Find shortest path to airlock
-                path_distance = self._find_shortest_path_distance(
-                    graph, module.module_id, airlock.module_id
-                )
-                
-                if path_distance is not None:
-                    # Convert to emergency egress time (faster movement)
-                    egress_time = path_distance / (self.crew_walking_speed * self.emergency_speed_factor)
-                    min_time_to_airlock = min(min_time_to_airlock, egress_time)
-                else:
-                    # If no path exists, use direct distance with penalty
-                    direct_distance = self._calculate_distance(module.position, airlock.position)
-                    penalty_time = direct_distance / (self.crew_walking_speed * self.emergency_speed_factor) * 3
-                    min_time_to_airlock = min(min_time_to_airlock, penalty_time)
-            
-            max_egress_time = max(max_egress_time, min_time_to_airlock)
+        emergency_speed = self.crew_walking_speed * self.emergency_speed_factor
         
-        return max_egress_time
+        # Shares the all-pairs matrix the transit metric already solved for this topology
+        shortest = self._shortest_path_matrix(layout)
+        
+        # Rows are the non-airlock modules, columns the airlocks
+        distances = layout.distances[~is_airlock][:, is_airlock]
+        path_distances = shortest[~is_airlock][:, is_airlock]
+        
+        # Emergency egress time (faster movement); if no path exists, use direct distance with penalty
+        egress_times = np.where(
+            np.isfinite(path_distances),
+            path_distances / emergency_speed,
+            distances / emergency_speed * 3
+        )
+        
+        # Time to nearest airlock, worst case over all modules
+        return float(egress_times.min(axis=1).max())
     
-    def _calculate_total_mass(self, modules: List[ModulePlacement]) -> float:
-        """Calculate total habitat mass"""
-        total_mass = 0.0
+    def _module_spec_table(self, module_ids: List[str]) -> np.ndarray:
+        """
+        Per-module spec values as an (N, _SPEC_COLUMNS) array, NaN where no definition is found.
         
-        for module in modules:
-            module_def = self._get_module_definition(module.module_id)
+        Definitions are looked up once per distinct module id and gathered
+        back to one row per placement with a single fancy index, so the
+        budget calculations reduce over columns instead of looping modules.
+        """
+        unique_ids, inverse = np.unique(module_ids, return_inverse=True)
+        unique_rows = np.full((len(unique_ids), _SPEC_COLUMNS), np.nan)
+        for row, module_id in zip(unique_rows, unique_ids.tolist()):
+            module_def = self._get_module_definition(module_id)
             if module_def:
-                total_mass += module_def.spec.mass_kg
-            else:
-                # Use default mass if module definition not found
-                total_mass += 1000.0  # kg default
-        
-        return total_mass
+                row[_SPEC_MASS_KG] = module_def.spec.mass_kg
+                row[_SPEC_POWER_W] = module_def.spec.power_w
+                row[_SPEC_STOWAGE_M3] = module_def.spec.stowage_m3
+                row[_SPEC_VOLUME_M3] = module_def.spec.bbox_m.volume
+        return unique_rows[inverse.reshape(-1)]
+    
+    def _calculate_total_mass(self, layout: _LayoutArrays) -> float:
+        """Calculate total habitat mass"""
+        # Use default mass if module definition not found
+        return float(layout.spec_sums[_SPEC_MASS_KG] + layout.spec_missing[_SPEC_MASS_KG] * 1000.0)  # kg default
     
     def _calculate_power_budget(
         self, 
-        modules: List[ModulePlacement], 
+        layout: _LayoutArrays, 
         mission_params: MissionParameters
     ) -> float:
         """Calculate total power consumption"""
-        total_power = 0.0
-        
-        # Module power consumption
-        for module in modules:
-            module_def = self._get_module_definition(module.module_id)
-            if module_def:
-                total_power += module_def.spec.power_w
-            else:
-                # Use default power if module definition not found
-                total_power += 500.0  # watts default
+        # Module power consumption, using default power if module definition not found
+        total_power = float(layout.spec_sums[_SPEC_POWER_W] + layout.spec_missing[_SPEC_POWER_W] * 500.0)  # watts default
         
         # Base crew power consumption
         crew_power = mission_params.crew_size * self.base_power_per_crew
@@ -266,22 +459,15 @@ class EnhancedScoringEngine:
     
     def _calculate_thermal_margin(
         self, 
-        modules: List[ModulePlacement], 
+        layout: _LayoutArrays, 
         mission_params: MissionParameters,
         envelope: EnvelopeSpec
     ) -> float:
         """Calculate thermal margin (simplified model)"""
-        # Calculate heat generation
+        # Calculate heat generation; modules without a definition add no heat
+        module_heat = float(layout.spec_sums[_SPEC_POWER_W]) * 0.1  # 10% of power becomes heat
         crew_heat = mission_params.crew_size * self.crew_heat_generation
-        
-        # Module heat generation (assume 10% of power becomes heat)
-        module_heat = 0.0
-        for module in modules:
-            module_def = self._get_module_definition(module.module_id)
-            if module_def:
-                module_heat += module_def.spec.power_w * 0.1
-        
-        total_heat_generation = crew_heat + module_heat + self.base_thermal_load
+        total_heat = module_heat + crew_heat + self.base_thermal_load
         
         # Estimate heat rejection capacity based on envelope surface area
         # This is a very simplified model
@@ -301,13 +487,13 @@ class EnhancedScoringEngine:
         heat_rejection_capacity = surface_area * 50.0
         
         # Calculate margin
-        thermal_margin = (heat_rejection_capacity - total_heat_generation) / heat_rejection_capacity
+        thermal_margin = (heat_rejection_capacity - total_heat) / heat_rejection_capacity
         
         return max(-0.5, min(1.0, thermal_margin))  # Clamp to reasonable range
     
     def _calculate_lss_margin(
         self, 
-        modules: List[ModulePlacement], 
+        layout: _LayoutArrays, 
         mission_params: MissionParameters
     ) -> float:
         """Calculate Life Support Systems margin"""
@@ -319,13 +505,13 @@ class EnhancedScoringEngine:
         daily_water_req = crew_size * self.water_consumption_per_crew
         
         # Estimate LSS capacity based on mechanical modules
-        mechanical_modules = [m for m in modules if m.type == ModuleType.MECHANICAL]
+        mechanical_count = layout.count(ModuleType.MECHANICAL)
         
-        if not mechanical_modules:
-            return -0.5  # No LSS - critical failure
+        if not mechanical_count:
+            return -0.2  # No LSS - critical failure, at the PerformanceMetrics floor
         
         # Simplified capacity model: each mechanical module supports 4 crew members
-        lss_capacity = len(mechanical_modules) * 4
+        lss_capacity = mechanical_count * 4
         
         # Calculate margin
         lss_margin = (lss_capacity - crew_size) / lss_capacity if lss_capacity > 0 else -0.5
@@ -334,56 +520,43 @@ class EnhancedScoringEngine:
     
     def _calculate_stowage_utilization(
         self, 
-        modules: List[ModulePlacement], 
+        layout: _LayoutArrays, 
         mission_params: MissionParameters
     ) -> float:
         """Calculate stowage utilization ratio"""
         # Calculate available stowage volume
-        total_stowage = 0.0
-        for module in modules:
-            module_def = self._get_module_definition(module.module_id)
-            if module_def:
-                total_stowage += module_def.spec.stowage_m3
+        total_stowage = float(layout.spec_sums[_SPEC_STOWAGE_M3])
         
-        # Estimate required stowage based on crew size and mission duration
+        # Estimate required stowage based on crew size and mission duration, in float64
         # Simplified model: 0.5 m³ per crew member per 30 days
-        required_stowage = mission_params.crew_size * (mission_params.duration_days / 30.0) * 0.5
+        crew_days = np.float64(mission_params.crew_size) * np.float64(mission_params.duration_days)
+        required_stowage = float(crew_days / 30.0 * 0.5)
+        
+        if total_stowage <= 0:
+            return 2.0  # High utilization if no stowage
         
-        return required_stowage / total_stowage if total_stowage > 0 else 2.0  # High utilization if no stowage
+        # Clamp to the PerformanceMetrics range (>2 is already severely overcrowded)
+        return min(2.0, required_stowage / total_stowage)
     
-    def _calculate_connectivity_score(
-        self, 
-        modules: List[ModulePlacement], 
-        graph: Dict[str, Dict[str, float]]
-    ) -> float:
+    def _calculate_connectivity_score(self, layout: _LayoutArrays) -> float:
         """Calculate connectivity quality score"""
-        if len(modules) < 2:
+        n = len(layout.positions)
+        if n < 2:
             return 1.0
         
-        # Check if graph is connected
-        if not self._is_graph_connected(graph):
+        # Check if graph is connected (linear-time, before any path solving)
+        if layout.component_count > 1:
             return 0.0  # Disconnected layout is critical failure
         
         # Calculate average path length
-        total_path_length = 0.0
-        path_count = 0
-        
-        module_ids = list(graph.keys())
-        for i, module_a in enumerate(module_ids):
-            for module_b in module_ids[i+1:]:
-                path_distance = self._find_shortest_path_distance(graph, module_a, module_b)
-                if path_distance is not None:
-                    total_path_length += path_distance
-                    path_count += 1
-        
-        avg_path_length = total_path_length / path_count if path_count > 0 else 10.0
+        avg_path_length = float(self._shortest_path_matrix(layout)[np.triu_indices(n, k=1)].mean())
         
         # Normalize against ideal path length (lower is better)
         path_score = max(0, 1 - (avg_path_length / 10.0))  # 10m as reference
         
         # Simple connectivity density score
-        total_possible_connections = len(modules) * (len(modules) - 1) // 2
-        actual_connections = sum(len(neighbors) for neighbors in graph.values()) // 2
+        total_possible_connections = n * (n - 1) // 2
+        actual_connections = len(layout.edge_rows)
         density_score = actual_connections / total_possible_connections if total_possible_connections > 0 else 0
         
         # Combine metrics
@@ -455,29 +628,32 @@ class EnhancedScoringEngine:
         """
         logger.info("Using basic metric calculations")
         
-        # Build connectivity graph
-        connectivity_graph = self._build_connectivity_graph(modules)
+        # Convert placements to arrays once; every helper below reads from them
+        layout = self._to_soa(modules)
         
-        # Calculate transit metrics
-        mean_transit_time = self._calculate_mean_transit_time(modules, connectivity_graph)
-        egress_time = self._calculate_egress_time(modules, connectivity_graph)
+        # Extreme missions and degenerate geometry can push the array math past float
+        # range; silence the per-element warnings here and judge the results as a whole
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            # Calculate transit metrics
+            mean_transit_time = self._calculate_mean_transit_time(layout)
+            egress_time = self._calculate_egress_time(layout)
         
-        # Calculate mass and power budgets
-        mass_total = self._calculate_total_mass(modules)
-        power_budget = self._calculate_power_budget(modules, mission_params)
+            # Calculate mass and power budgets
+            mass_total = self._calculate_total_mass(layout)
+            power_budget = self._calculate_power_budget(layout, mission_params)
         
-        # Calculate system margins
-        thermal_margin = self._calculate_thermal_margin(modules, mission_params, envelope)
-        lss_margin = self._calculate_lss_margin(modules, mission_params)
+            # Calculate system margins
+            thermal_margin = self._calculate_thermal_margin(layout, mission_params, envelope)
+            lss_margin = self._calculate_lss_margin(layout, mission_params)
         
-        # Calculate stowage utilization
-        stowage_utilization = self._calculate_stowage_utilization(modules, mission_params)
+            # Calculate stowage utilization
+            stowage_utilization = self._calculate_stowage_utilization(layout, mission_params)
         
-        # Calculate additional scores
-        connectivity_score = self._calculate_connectivity_score(modules, connectivity_graph)
-        safety_score = self._calculate_safety_score(modules, egress_time, mission_params)
-        efficiency_score = self._calculate_efficiency_score(modules, mean_transit_time, mission_params)
-        volume_utilization = self._calculate_volume_utilization(modules, envelope)
+            # Calculate additional scores
+            connectivity_score = self._calculate_connectivity_score(layout)
+            safety_score = self._calculate_safety_score(layout, egress_time, mission_params)
+            efficiency_score = self._calculate_efficiency_score(modules, layout, mean_transit_time, mission_params)
+            volume_utilization = self._calculate_volume_utilization(layout, envelope)
         
         return PerformanceMetrics(
             mean_transit_time=mean_transit_time,
@@ -495,7 +671,7 @@ class EnhancedScoringEngine:
     
     def _calculate_safety_score(
         self, 
-        modules: List[ModulePlacement], 
+        layout: _LayoutArrays, 
         egress_time: float,
         mission_params: MissionParameters
     ) -> float:
@@ -504,12 +680,10 @@ class EnhancedScoringEngine:
         egress_score = max(0, 1 - (egress_time / 180.0))
         
         # Airlock redundancy component
-        airlocks = [m for m in modules if m.type == ModuleType.AIRLOCK]
-        airlock_score = min(1.0, len(airlocks) / 2.0)  # Target: 2 airlocks
+        airlock_score = min(1.0, layout.count(ModuleType.AIRLOCK) / 2.0)  # Target: 2 airlocks
         
         # Medical facility component
-        medical_modules = [m for m in modules if m.type == ModuleType.MEDICAL]
-        medical_score = 1.0 if medical_modules else 0.5
+        medical_score = 1.0 if layout.count(ModuleType.MEDICAL) else 0.5
         
         # Combine components
         safety_score = (egress_score * 0.5 + airlock_score * 0.3 + medical_score * 0.2)
@@ -519,6 +693,7 @@ class EnhancedScoringEngine:
     def _calculate_efficiency_score(
         self, 
         modules: List[ModulePlacement], 
+        layout: _LayoutArrays,
         mean_transit_time: float,
         mission_params: MissionParameters
     ) -> float:
@@ -527,18 +702,19 @@ class EnhancedScoringEngine:
         transit_score = max(0, 1 - (mean_transit_time / 60.0))
         
         # Module adjacency component (check if related modules are close)
-        adjacency_score = self._calculate_adjacency_score(modules)
+        adjacency_score = self._calculate_adjacency_score(modules, layout)
         
         # Combine components
         efficiency_score = (transit_score * 0.7 + adjacency_score * 0.3)
         
         return max(0.0, min(1.0, efficiency_score))
     
-    def _calculate_adjacency_score(self, modules: List[ModulePlacement]) -> float:
+    def _calculate_adjacency_score(self, modules: List[ModulePlacement], layout: _LayoutArrays) -> float:
         """Calculate score based on module adjacency preferences"""
         if len(modules) < 2:
             return 1.0
         
+        distances = layout.distances
         total_score = 0.0
         scored_pairs = 0
         
@@ -547,8 +723,9 @@ class EnhancedScoringEngine:
             if not module_def_a:
                 continue
             
-            for module_b in modules[i+1:]:
-                distance = self._calculate_distance(module_a.position, module_b.position)
+            for j in range(i + 1, len(modules)):
+                module_b = modules[j]
+                distance = distances[i, j]
                 
                 # Check adjacency preferences
                 if module_b.type in module_def_a.spec.adjacency_preferences:
@@ -566,16 +743,12 @@ class EnhancedScoringEngine:
     
     def _calculate_volume_utilization(
         self, 
-        modules: List[ModulePlacement], 
+        layout: _LayoutArrays, 
         envelope: EnvelopeSpec
     ) -> float:
         """Calculate habitat volume utilization ratio"""
         # Calculate total module volume
-        total_module_volume = 0.0
-        for module in modules:
-            module_def = self._get_module_definition(module.module_id)
-            if module_def:
-                total_module_volume += module_def.spec.bbox_m.volume
+        total_module_volume = float(layout.spec_sums[_SPEC_VOLUME_M3])
         
         # Calculate envelope volume
         envelope_volume = envelope.volume
@@ -604,65 +777,3 @@ class EnhancedScoringEngine:
                     return module_def
         
         return None
-    
-    def _find_shortest_path_distance(
-        self, 
-        graph: Dict[str, Dict[str, float]], 
-        start: str, 
-        end: str
-    ) -> Optional[float]:
-        """Find shortest path distance between two nodes using Dijkstra's algorithm"""
-        if start not in graph or end not in graph:
-            return None
-        
-        if start == end:
-            return 0.0
-        
-        # Dijkstra's algorithm
-        distances = {node: float('inf') for node in graph}
-        distances[start] = 0.0
-        visited = set()
-        
-        while True:
-            # Find unvisited node with minimum distance
-            current = None
-            min_distance = float('inf')
-            
-            for node in graph:
-                if node not in visited and distances[node] < min_distance:
-                    min_distance = distances[node]
-                    current = node
-            
-            if current is None or current == end:
-                break
-            
-            visited.add(current)
-            
-            # Update distances to neighbors
-            for neighbor, edge_weight in graph[current].items():
-                if neighbor not in visited:
-                    new_distance = distances[current] + edge_weight
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-        
-        return distances[end] if distances[end] != float('inf') else None
-    
-    def _is_graph_connected(self, graph: Dict[str, Dict[str, float]]) -> bool:
-        """Check if graph is connected using BFS"""
-        if not graph:
-            return True
-        
-        # Start BFS from first node
-        start_node = next(iter(graph.keys()))
-        visited = set()
-        queue = deque([start_node])
-        visited.add(start_node)
-        
-        while queue:
-            current = queue.popleft()
-            for neighbor in graph[current]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        
-        return len(visited) == len(graph)
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Shared pytest fixtures for the backend test suite.
+"""
+
+import asyncio
+import os
+from functools import lru_cache
+from pathlib import Path
+
+# Share numba's on-disk kernel cache across runs and xdist workers; numba reads
+# this at import time, so it has to be set before any app module loads
+os.environ.setdefault("NUMBA_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".numba_cache"))
+
+import numpy as np
+import pytest
+
+from app.models.base import (
+    EnvelopeSpec, MissionParameters, EnvelopeType, CoordinateFrame, EnvelopeMetadata
+)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Put every test marked serial into one dedicated pytest-xdist group.
+
+    Under ``-n auto --dist loadgroup`` the whole group is sent to a single
+    worker and run one test at a time, so serial tests never run alongside
+    each other. Runs before xdist tags node ids with their group.
+    """
+    for item in items:
+        if item.get_closest_marker("serial"):
+            item.add_marker(pytest.mark.xdist_group(name="serial"), append=False)
+
+
+@lru_cache(maxsize=None)
+def _cached_envelope(
+    envelope_id: str, name: str, envelope_type: EnvelopeType, **params: float
+) -> EnvelopeSpec:
+    return EnvelopeSpec(
+        id=envelope_id,
+        type=envelope_type,
+        params=params,
+        coordinate_frame=CoordinateFrame.LOCAL,
+        metadata=EnvelopeMetadata(name=name, creator="test")
+    )
+
+
+@lru_cache(maxsize=None)
+def _cached_mission(crew_size: int, duration_days: int) -> MissionParameters:
+    return MissionParameters(crew_size=crew_size, duration_days=duration_days)
+
+
+@pytest.fixture(scope="session")
+def make_envelope():
+    """
+    Factory for validated test envelopes.
+
+    EnvelopeSpec is frozen, so one instance per distinct geometry is shared
+    by every test that asks for it instead of re-running validation.
+    """
+    return _cached_envelope
+
+
+@pytest.fixture(scope="session")
+def make_mission():
+    """Factory for shared, frozen MissionParameters keyed on crew size and duration"""
+    return _cached_mission
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_numeric_kernels():
+    """
+    Import SciPy's sparse graph routines and compile the scoring kernels once.
+
+    Cheap enough to run for every session, and keeps the one-time import and
+    JIT cost out of whichever test happens to score a layout first.
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components, dijkstra
+
+    from app.services import _scoring_kernels
+
+    graph = csr_matrix(np.eye(2))
+    connected_components(graph, directed=False, return_labels=False)
+    dijkstra(graph, directed=False)
+    _scoring_kernels.spec_totals(np.zeros((1, 4)))
+
+
+@pytest.fixture(scope="session")
+def warm_library():
+    """
+    Module library after warming the optimizer's caches, once per session
+    (or per xdist worker).
+
+    Loads the module library, compiles the bounds kernel and runs a
+    throwaway single-generation optimization so the first optimization test
+    doesn't pay the cold-start cost, then returns the warmed library. Opted
+    into by the optimization test modules rather than autouse, so unrelated
+    tests don't wait on it.
+    """
+    from app.services.nsga2_optimizer import (
+        NSGA2Optimizer, OptimizationConfig, _count_bounds_violations
+    )
+
+    _count_bounds_violations(np.zeros((1, 3)), np.zeros((1, 3)), 1, np.ones(3))
+
+    envelope = EnvelopeSpec(
+        id="warmup_envelope",
+        type=EnvelopeType.CYLINDER,
+        params={"radius": 4.0, "length": 16.0},
+        coordinate_frame=CoordinateFrame.LOCAL,
+        metadata=EnvelopeMetadata(name="Warmup", creator="conftest")
+    )
+    mission = MissionParameters(crew_size=1, duration_days=7)
+
+    optimizer = NSGA2Optimizer(OptimizationConfig(population_size=4, generations=1))
+    try:
+        asyncio.run(optimizer.optimize_layout(envelope, mission))
+    finally:
+        optimizer.executor.shutdown(wait=True)
+
+    return optimizer.module_library
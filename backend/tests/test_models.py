@@ -1,10 +1,19 @@
 # Unit tests for Pydantic models
 
 import pytest
+import os
+import sys
 from datetime import datetime
+from types import MappingProxyType
 from pydantic import ValidationError
 import math
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from app.models.base import (
     EnvelopeSpec,
     EnvelopeType,
@@ -29,8 +38,42 @@ from app.models.base import (
 # TEST HELPERS
 # ============================================================================
 
+# Shared identifiers, interned once so every helper reuses the same objects
+MOD_ID = sys.intern("mod_001")
+ENV_ID = sys.intern("env_001")
+LAYOUT_ID = sys.intern("layout_001")
+SLEEP = ModuleType.SLEEP_QUARTER
+
+# Read-only mission inputs shared by every create_valid_mission_parameters() call
+PRIORITY_WEIGHTS = MappingProxyType({
+    "safety": 0.4,
+    "efficiency": 0.3,
+    "mass": 0.2,
+    "power": 0.1
+})
+ACTIVITY_SCHEDULE = MappingProxyType({
+    "sleep": 8.0,
+    "work": 8.0,
+    "exercise": 2.0,
+    "meals": 3.0,
+    "personal": 3.0
+})
+
+# TEST_FAST=1 builds factory models with model_construct(), skipping validators.
+# Validation-focused tests construct models directly and are unaffected.
+FAST_CONSTRUCT = bool(os.environ.get("TEST_FAST"))
+
+
+def _build(model_cls, **fields):
+    """Construct a factory model, bypassing validation in smoke mode"""
+    if FAST_CONSTRUCT:
+        return model_cls.model_construct(**fields)
+    return model_cls(**fields)
+
+
 def create_valid_envelope_metadata():
-    return EnvelopeMetadata(
+    return _build(
+        EnvelopeMetadata,
         name="Test Envelope",
         creator="test_user",
         created=datetime(2024, 1, 1),
@@ -40,8 +83,9 @@ def create_valid_envelope_metadata():
 
 
 def create_valid_envelope_spec():
-    return EnvelopeSpec(
-        id="env_001",
+    return _build(
+        EnvelopeSpec,
+        id=ENV_ID,
         type=EnvelopeType.CYLINDER,
         params={"radius": 3.0, "length": 12.0},
         coordinate_frame=CoordinateFrame.LOCAL,
@@ -50,13 +94,14 @@ def create_valid_envelope_spec():
 
 
 def create_valid_bounding_box():
-    return BoundingBox(x=2.0, y=2.0, z=2.5)
+    return _build(BoundingBox, x=2.0, y=2.0, z=2.5)
 
 
 def create_valid_module_spec():
-    return ModuleSpec(
-        module_id="mod_001",
-        type=ModuleType.SLEEP_QUARTER,
+    return _build(
+        ModuleSpec,
+        module_id=MOD_ID,
+        type=SLEEP,
         name="Sleep Quarter A",
         bbox_m=create_valid_bounding_box(),
         mass_kg=500.0,
@@ -69,17 +114,19 @@ def create_valid_module_spec():
 
 
 def create_valid_module_placement():
-    return ModulePlacement(
-        module_id="mod_001",
-        type=ModuleType.SLEEP_QUARTER,
-        position=[1.0, 2.0, 3.0],
+    return _build(
+        ModulePlacement,
+        module_id=MOD_ID,
+        type=SLEEP,
+        position=(1.0, 2.0, 3.0),
         rotation_deg=45.0,
         connections=["mod_002"]
     )
 
 
 def create_valid_performance_metrics():
-    return PerformanceMetrics(
+    return _build(
+        PerformanceMetrics,
         mean_transit_time=30.5,
         egress_time=120.0,
         mass_total=15000.0,
@@ -91,36 +138,60 @@ def create_valid_performance_metrics():
 
 
 def create_valid_mission_parameters():
-    return MissionParameters(
+    return _build(
+        MissionParameters,
         crew_size=4,
         duration_days=180,
-        priority_weights={
-            "safety": 0.4,
-            "efficiency": 0.3,
-            "mass": 0.2,
-            "power": 0.1
-        },
-        activity_schedule={
-            "sleep": 8.0,
-            "work": 8.0,
-            "exercise": 2.0,
-            "meals": 3.0,
-            "personal": 3.0
-        },
+        priority_weights=PRIORITY_WEIGHTS,
+        activity_schedule=ACTIVITY_SCHEDULE,
         emergency_scenarios=["fire", "depressurization"]
     )
 
 
 def create_valid_layout_spec():
-    return LayoutSpec(
-        layout_id="layout_001",
-        envelope_id="env_001",
+    return _build(
+        LayoutSpec,
+        layout_id=LAYOUT_ID,
+        envelope_id=ENV_ID,
         modules=[create_valid_module_placement()],
         kpis=create_valid_performance_metrics(),
         explainability="This layout prioritizes safety by placing modules strategically."
     )
 
 
+def json_roundtrip(model):
+    """Serialize a model to JSON and validate it back through pydantic-core's JSON parser"""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(model.model_dump(mode="json"))
+    else:
+        payload = model.model_dump_json()
+    return type(model).model_validate_json(payload)
+
+
+@pytest.fixture(scope="session")
+def base_envelope():
+    """Validated envelope shared across the session; model_copy() before mutating"""
+    return create_valid_envelope_spec()
+
+
+@pytest.fixture(scope="session")
+def base_layout():
+    """Validated layout shared across the session; model_copy() before mutating"""
+    return create_valid_layout_spec()
+
+
+@pytest.fixture(scope="session")
+def base_mission():
+    """Validated mission parameters shared across the session"""
+    return create_valid_mission_parameters()
+
+
+@pytest.fixture(scope="session")
+def base_metrics():
+    """Validated performance metrics shared across the session"""
+    return create_valid_performance_metrics()
+
+
 # ============================================================================
 # ENVELOPE TESTS
 # ============================================================================
@@ -128,7 +199,7 @@ def create_valid_layout_spec():
 class TestEnvelopeSpec:
     def test_valid_cylinder_envelope(self):
         envelope = create_valid_envelope_spec()
-        assert envelope.id == "env_001"
+        assert envelope.id == ENV_ID
         assert envelope.type == EnvelopeType.CYLINDER
         assert envelope.params["radius"] == 3.0
         assert envelope.params["length"] == 12.0
@@ -138,24 +209,31 @@ class TestEnvelopeSpec:
         assert abs(envelope.volume - expected_volume) < 1e-6
 
     def test_valid_box_envelope(self):
-        envelope = create_valid_envelope_spec()
-        envelope.type = EnvelopeType.BOX
-        envelope.params = {"width": 5.0, "height": 3.0, "depth": 8.0}
+        envelope = create_valid_envelope_spec().model_copy(update={
+            "type": EnvelopeType.BOX,
+            "params": {"width": 5.0, "height": 3.0, "depth": 8.0}
+        })
         
         assert envelope.volume == 120.0  # 5 * 3 * 8
 
     def test_valid_torus_envelope(self):
-        envelope = create_valid_envelope_spec()
-        envelope.type = EnvelopeType.TORUS
-        envelope.params = {"major_radius": 5.0, "minor_radius": 2.0}
+        envelope = create_valid_envelope_spec().model_copy(update={
+            "type": EnvelopeType.TORUS,
+            "params": {"major_radius": 5.0, "minor_radius": 2.0}
+        })
         
         expected_volume = 2 * math.pi * math.pi * 5.0 * 2.0 * 2.0
         assert abs(envelope.volume - expected_volume) < 1e-6
 
+    def test_envelope_is_frozen(self):
+        envelope = create_valid_envelope_spec()
+        with pytest.raises(ValidationError):
+            envelope.id = "other_envelope"
+
     def test_invalid_cylinder_params(self):
         with pytest.raises(ValidationError) as exc_info:
             EnvelopeSpec(
-                id="env_001",
+                id=ENV_ID,
                 type=EnvelopeType.CYLINDER,
                 params={"radius": -1.0, "length": 12.0},  # Negative radius
                 coordinate_frame=CoordinateFrame.LOCAL,
@@ -166,7 +244,7 @@ class TestEnvelopeSpec:
     def test_missing_cylinder_params(self):
         with pytest.raises(ValidationError) as exc_info:
             EnvelopeSpec(
-                id="env_001",
+                id=ENV_ID,
                 type=EnvelopeType.CYLINDER,
                 params={"radius": 3.0},  # Missing length
                 coordinate_frame=CoordinateFrame.LOCAL,
@@ -177,7 +255,7 @@ class TestEnvelopeSpec:
     def test_invalid_torus_params(self):
         with pytest.raises(ValidationError) as exc_info:
             EnvelopeSpec(
-                id="env_001",
+                id=ENV_ID,
                 type=EnvelopeType.TORUS,
                 params={"major_radius": 2.0, "minor_radius": 3.0},  # minor >= major
                 coordinate_frame=CoordinateFrame.LOCAL,
@@ -218,8 +296,8 @@ class TestBoundingBox:
 class TestModuleSpec:
     def test_valid_module_spec(self):
         module = create_valid_module_spec()
-        assert module.module_id == "mod_001"
-        assert module.type == ModuleType.SLEEP_QUARTER
+        assert module.module_id == MOD_ID
+        assert module.type == SLEEP
         assert module.mass_kg == 500.0
         assert module.power_w == 100.0
         
@@ -230,8 +308,8 @@ class TestModuleSpec:
     def test_invalid_mass(self):
         with pytest.raises(ValidationError):
             ModuleSpec(
-                module_id="mod_001",
-                type=ModuleType.SLEEP_QUARTER,
+                module_id=MOD_ID,
+                type=SLEEP,
                 name="Test Module",
                 bbox_m=create_valid_bounding_box(),
                 mass_kg=0.05,  # Below minimum
@@ -242,8 +320,8 @@ class TestModuleSpec:
     def test_excessive_stowage_volume(self):
         with pytest.raises(ValidationError) as exc_info:
             ModuleSpec(
-                module_id="mod_001",
-                type=ModuleType.SLEEP_QUARTER,
+                module_id=MOD_ID,
+                type=SLEEP,
                 name="Test Module",
                 bbox_m=create_valid_bounding_box(),
                 mass_kg=500.0,
@@ -255,8 +333,8 @@ class TestModuleSpec:
     def test_conflicting_adjacency_rules(self):
         with pytest.raises(ValidationError) as exc_info:
             ModuleSpec(
-                module_id="mod_001",
-                type=ModuleType.SLEEP_QUARTER,
+                module_id=MOD_ID,
+                type=SLEEP,
                 name="Test Module",
                 bbox_m=create_valid_bounding_box(),
                 mass_kg=500.0,
@@ -271,8 +349,8 @@ class TestModuleSpec:
 class TestModulePlacement:
     def test_valid_module_placement(self):
         placement = create_valid_module_placement()
-        assert placement.module_id == "mod_001"
-        assert placement.position == [1.0, 2.0, 3.0]
+        assert placement.module_id == MOD_ID
+        assert placement.position == (1.0, 2.0, 3.0)
         assert placement.rotation_deg == 45.0
         
         # Test computed field
@@ -282,27 +360,27 @@ class TestModulePlacement:
     def test_invalid_position_format(self):
         with pytest.raises(ValidationError):
             ModulePlacement(
-                module_id="mod_001",
-                type=ModuleType.SLEEP_QUARTER,
-                position=[1.0, 2.0],  # Missing Z coordinate
+                module_id=MOD_ID,
+                type=SLEEP,
+                position=(1.0, 2.0),  # Missing Z coordinate
                 rotation_deg=45.0
             )
 
     def test_invalid_position_values(self):
         with pytest.raises(ValidationError) as exc_info:
             ModulePlacement(
-                module_id="mod_001",
-                type=ModuleType.SLEEP_QUARTER,
-                position=[1.0, float('inf'), 3.0],  # Infinite coordinate
+                module_id=MOD_ID,
+                type=SLEEP,
+                position=(1.0, float('inf'), 3.0),  # Infinite coordinate
                 rotation_deg=45.0
             )
         assert "must be a finite number" in str(exc_info.value)
 
     def test_rotation_normalization(self):
         placement = ModulePlacement(
-            module_id="mod_001",
-            type=ModuleType.SLEEP_QUARTER,
-            position=[1.0, 2.0, 3.0],
+            module_id=MOD_ID,
+            type=SLEEP,
+            position=(1.0, 2.0, 3.0),
             rotation_deg=450.0  # Should normalize to 90.0
         )
         assert placement.rotation_deg == 90.0
@@ -322,6 +400,19 @@ class TestMissionParameters:
         assert mission.total_crew_hours == 4 * 180 * 24
         assert mission.daily_activity_total == 24.0
 
+    @pytest.mark.parametrize("priority_weights", [
+        {"safety": 0.4, "efficiency": 0.3, "mass": 0.2, "power": 0.1},
+        {"safety": 0.1 + 0.2, "efficiency": 0.3, "mass": 0.2, "power": 0.2},  # 0.30000000000000004
+        {"safety": 0.1, "efficiency": 0.1, "mass": 0.1, "power": 0.1, "comfort": 0.6},
+    ])
+    def test_priority_weights_sum_tolerance(self, priority_weights):
+        mission = MissionParameters(
+            crew_size=4,
+            duration_days=180,
+            priority_weights=priority_weights
+        )
+        assert mission.priority_weights == priority_weights
+
     def test_invalid_priority_weights_sum(self):
         with pytest.raises(ValidationError) as exc_info:
             MissionParameters(
@@ -448,6 +539,12 @@ class TestPerformanceMetrics:
         assert any("egress time" in issue for issue in issues)
         assert any("transit times" in issue for issue in issues)
 
+    def test_performance_metrics_is_frozen(self):
+        metrics = create_valid_performance_metrics()
+        with pytest.raises(ValidationError):
+            metrics.mass_total = 0.0
+        assert metrics == create_valid_performance_metrics()
+
 
 # ============================================================================
 # LAYOUT SPEC TESTS
@@ -456,8 +553,8 @@ class TestPerformanceMetrics:
 class TestLayoutSpec:
     def test_valid_layout_spec(self):
         layout = create_valid_layout_spec()
-        assert layout.layout_id == "layout_001"
-        assert layout.envelope_id == "env_001"
+        assert layout.layout_id == LAYOUT_ID
+        assert layout.envelope_id == ENV_ID
         assert len(layout.modules) == 1
         
         # Test computed fields
@@ -465,11 +562,23 @@ class TestLayoutSpec:
         assert layout.module_types_count["sleep_quarter"] == 1
         assert not layout.has_airlock  # No airlock in test layout
 
+    def test_type_views_follow_modules(self):
+        layout = create_valid_layout_spec()
+        assert not layout.has_airlock
+        assert layout == create_valid_layout_spec()  # Reads leave no state behind
+        
+        airlock = create_valid_module_placement().model_copy(
+            update={"module_id": "airlock_001", "type": "airlock"}
+        )
+        extended = layout.model_copy(update={"modules": [*layout.modules, airlock]})
+        assert extended.has_airlock
+        assert extended.module_types_count == {"sleep_quarter": 1, "airlock": 1}
+
     def test_empty_modules_validation(self):
         with pytest.raises(ValidationError) as exc_info:
             LayoutSpec(
-                layout_id="layout_001",
-                envelope_id="env_001",
+                layout_id=LAYOUT_ID,
+                envelope_id=ENV_ID,
                 modules=[],  # Empty modules list
                 kpis=create_valid_performance_metrics(),
                 explainability="Test explanation"
@@ -483,8 +592,8 @@ class TestLayoutSpec:
         
         with pytest.raises(ValidationError) as exc_info:
             LayoutSpec(
-                layout_id="layout_001",
-                envelope_id="env_001",
+                layout_id=LAYOUT_ID,
+                envelope_id=ENV_ID,
                 modules=[placement1, placement2],
                 kpis=create_valid_performance_metrics(),
                 explainability="Test explanation"
@@ -494,8 +603,8 @@ class TestLayoutSpec:
     def test_short_explainability(self):
         with pytest.raises(ValidationError) as exc_info:
             LayoutSpec(
-                layout_id="layout_001",
-                envelope_id="env_001",
+                layout_id=LAYOUT_ID,
+                envelope_id=ENV_ID,
                 modules=[create_valid_module_placement()],
                 kpis=create_valid_performance_metrics(),
                 explainability="Short"  # Too short
@@ -504,21 +613,21 @@ class TestLayoutSpec:
 
     def test_layout_bounds_calculation(self):
         placement1 = ModulePlacement(
-            module_id="mod_001",
-            type=ModuleType.SLEEP_QUARTER,
-            position=[1.0, 2.0, 3.0],
+            module_id=MOD_ID,
+            type=SLEEP,
+            position=(1.0, 2.0, 3.0),
             rotation_deg=0.0
         )
         placement2 = ModulePlacement(
             module_id="mod_002",
             type=ModuleType.GALLEY,
-            position=[4.0, 1.0, 2.0],
+            position=(4.0, 1.0, 2.0),
             rotation_deg=0.0
         )
         
         layout = LayoutSpec(
-            layout_id="layout_001",
-            envelope_id="env_001",
+            layout_id=LAYOUT_ID,
+            envelope_id=ENV_ID,
             modules=[placement1, placement2],
             kpis=create_valid_performance_metrics(),
             explainability="Test layout with multiple modules"
@@ -536,13 +645,13 @@ class TestLayoutSpec:
         airlock_placement = ModulePlacement(
             module_id="airlock_001",
             type=ModuleType.AIRLOCK,
-            position=[0.0, 0.0, 0.0],
+            position=(0.0, 0.0, 0.0),
             rotation_deg=0.0
         )
         
         layout = LayoutSpec(
-            layout_id="layout_001",
-            envelope_id="env_001",
+            layout_id=LAYOUT_ID,
+            envelope_id=ENV_ID,
             modules=[create_valid_module_placement(), airlock_placement],
             kpis=create_valid_performance_metrics(),
             explainability="Layout with airlock module"
@@ -557,11 +666,11 @@ class TestLayoutSpec:
 # ============================================================================
 
 class TestModelIntegration:
-    def test_complete_habitat_specification(self):
+    def test_complete_habitat_specification(self, base_envelope, base_mission, base_metrics):
         """Test creating a complete habitat specification with all models"""
         
-        # Create envelope
-        envelope = create_valid_envelope_spec()
+        # Shared envelope
+        envelope = base_envelope
         
         # Create modules
         sleep_module = create_valid_module_spec()
@@ -580,16 +689,14 @@ class TestModelIntegration:
         galley_placement = ModulePlacement(
             module_id="galley_001",
             type=ModuleType.GALLEY,
-            position=[5.0, 0.0, 0.0],
+            position=(5.0, 0.0, 0.0),
             rotation_deg=90.0,
-            connections=["mod_001"]
+            connections=[MOD_ID]
         )
         
-        # Create mission parameters
-        mission = create_valid_mission_parameters()
-        
-        # Create performance metrics
-        metrics = create_valid_performance_metrics()
+        # Shared mission parameters and performance metrics
+        mission = base_mission
+        metrics = base_metrics
         
         # Create layout
         layout = LayoutSpec(
@@ -609,19 +716,18 @@ class TestModelIntegration:
         assert layout.module_count == 2
         assert layout.has_airlock is False  # No airlock in this test layout
 
-    def test_model_serialization_deserialization(self):
+    def test_model_serialization_deserialization(self, base_envelope, base_layout):
         """Test that models can be serialized to JSON and back"""
         
         # Test envelope serialization
-        envelope = create_valid_envelope_spec()
-        envelope_dict = envelope.model_dump()
-        envelope_restored = EnvelopeSpec(**envelope_dict)
+        envelope = base_envelope
+        envelope_restored = json_roundtrip(envelope)
         assert envelope_restored.id == envelope.id
         assert envelope_restored.volume == envelope.volume
         
         # Test layout serialization
-        layout = create_valid_layout_spec()
-        layout_dict = layout.model_dump()
-        layout_restored = LayoutSpec(**layout_dict)
+        layout = base_layout
+        layout_restored = json_roundtrip(layout)
         assert layout_restored.layout_id == layout.layout_id
-        assert layout_restored.module_count == layout.module_count
\ No newline at end of file
+        assert layout_restored.module_count == layout.module_count
+        assert layout_restored.modules[0].position == layout.modules[0].position
\ No newline at end of file
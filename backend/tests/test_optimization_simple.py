@@ -2,15 +2,30 @@
 Simplified tests for optimization algorithm functionality.
 """
 
+import gc
+import os
 import pytest
 import asyncio
+import psutil
 from typing import List, Dict, Any
 
-from app.services.nsga2_optimizer import NSGA2Optimizer, OptimizationConfig
+from app.services.nsga2_optimizer import NSGA2Optimizer, OptimizationConfig, HabitatLayoutProblem
+from app.services.scoring_engine import ScoringError
 from app.models.base import (
     EnvelopeSpec, MissionParameters, EnvelopeType, CoordinateFrame, EnvelopeMetadata
 )
 
+pytestmark = pytest.mark.usefixtures("warm_library")
+
+
+# Resolved once so the first RSS reading isn't skewed by psutil's process setup
+_PROC = psutil.Process(os.getpid())
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    return _PROC.memory_info().rss / (1024 * 1024)
+
 
 class TestOptimizationBasics:
     """Basic tests for optimization functionality"""
@@ -42,26 +57,16 @@ class TestOptimizationBasics:
         assert 0 <= optimizer.config.mutation_prob <= 1
     
     @pytest.mark.asyncio
-    async def test_optimization_with_simple_envelope(self):
+    async def test_optimization_with_simple_envelope(self, make_envelope, make_mission):
         """Test optimization with a simple envelope"""
         
         # Create simple test envelope
-        envelope = EnvelopeSpec(
-            id="simple_test_envelope",
-            type=EnvelopeType.CYLINDER,
-            params={"radius": 4.0, "length": 16.0},
-            coordinate_frame=CoordinateFrame.LOCAL,
-            metadata=EnvelopeMetadata(
-                name="Simple Test Habitat",
-                creator="test"
-            )
+        envelope = make_envelope(
+            "simple_test_envelope", "Simple Test Habitat", EnvelopeType.CYLINDER, radius=4.0, length=16.0
         )
         
         # Create simple mission
-        mission = MissionParameters(
-            crew_size=2,
-            duration_days=30
-        )
+        mission = make_mission(2, 30)
         
         # Create optimizer with minimal configuration
         config = OptimizationConfig(
@@ -117,7 +122,7 @@ class TestOptimizationErrorHandling:
     """Test error handling in optimization"""
     
     @pytest.mark.asyncio
-    async def test_invalid_envelope_handling(self):
+    async def test_invalid_envelope_handling(self, make_mission):
         """Test handling of invalid envelope specifications"""
         
         # Create invalid envelope (negative dimensions)
@@ -129,7 +134,7 @@ class TestOptimizationErrorHandling:
             metadata=EnvelopeMetadata(name="Invalid", creator="test")
         )
         
-        mission = MissionParameters(crew_size=2, duration_days=30)
+        mission = make_mission(2, 30)
         
         config = OptimizationConfig(population_size=5, generations=2)
         optimizer = NSGA2Optimizer(config)
@@ -173,23 +178,45 @@ class TestOptimizationErrorHandling:
         assert any(keyword in error_msg for keyword in 
                   ["constraint", "impossible", "space", "crew", "capacity"])
 
+    def test_non_finite_metrics_penalized(self, make_envelope, make_mission, warm_library):
+        """Test that a ScoringError from the engine becomes a penalized candidate"""
+        
+        config = OptimizationConfig(population_size=4, generations=1)
+        problem = HabitatLayoutProblem(
+            make_envelope("scoring_error_envelope", "Scoring Error", EnvelopeType.CYLINDER, radius=4.0, length=16.0),
+            make_mission(2, 30),
+            [warm_library.get_module("std_sleep_quarter")],
+            config
+        )
+        
+        async def raise_scoring_error(*args, **kwargs):
+            raise ScoringError("non-finite metric")
+        
+        problem._calculate_constraint_penalty = lambda placements: 0.0
+        problem.scoring_engine.calculate_metrics = raise_scoring_error
+        
+        objectives, penalty = problem._evaluate_objectives([])
+        
+        assert penalty == 1e6
+        assert (objectives == 1e6).all()
+        assert len(objectives) == len(config.objectives)
+        
+        # Counted separately from other failed evaluations
+        assert problem.non_finite_evaluations == 1
+
 
 class TestOptimizationPerformance:
     """Basic performance tests for optimization"""
     
     @pytest.mark.asyncio
-    async def test_optimization_timeout(self):
+    async def test_optimization_timeout(self, make_envelope, make_mission):
         """Test that optimization completes within reasonable time"""
         
-        envelope = EnvelopeSpec(
-            id="timeout_test",
-            type=EnvelopeType.BOX,
-            params={"width": 5.0, "height": 4.0, "depth": 10.0},
-            coordinate_frame=CoordinateFrame.LOCAL,
-            metadata=EnvelopeMetadata(name="Timeout Test", creator="test")
+        envelope = make_envelope(
+            "timeout_test", "Timeout Test", EnvelopeType.BOX, width=5.0, height=4.0, depth=10.0
         )
         
-        mission = MissionParameters(crew_size=3, duration_days=60)
+        mission = make_mission(3, 60)
         
         # Small configuration for quick test
         config = OptimizationConfig(population_size=5, generations=2)
@@ -219,11 +246,8 @@ class TestOptimizationPerformance:
     
     def test_memory_usage_basic(self):
         """Basic memory usage test"""
-        import psutil
-        import os
-        
-        process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
+        gc.collect()
+        initial_memory = _rss_mb()
         
         # Create multiple optimizers
         optimizers = []
@@ -232,7 +256,8 @@ class TestOptimizationPerformance:
             optimizer = NSGA2Optimizer(config)
             optimizers.append(optimizer)
         
-        final_memory = process.memory_info().rss / 1024 / 1024  # MB
+        gc.collect()
+        final_memory = _rss_mb()
         memory_increase = final_memory - initial_memory
         
         # Memory increase should be reasonable (less than 50MB for 5 optimizers)
@@ -2,16 +2,102 @@
 Comprehensive tests for scoring engine accuracy and consistency.
 """
 
+import asyncio
+import math
 import pytest
 import numpy as np
+from functools import lru_cache
 from typing import List, Dict, Any
 
-from app.services.scoring_engine import ScoringEngine, ScoringError
+from app.services.scoring_engine import EnhancedScoringEngine, ScoringError
+from app.models.module_library import ModuleLibrary, get_module_library
 from app.models.base import (
     LayoutSpec, ModulePlacement, PerformanceMetrics, EnvelopeSpec,
     MissionParameters, ModuleType, EnvelopeType, CoordinateFrame, EnvelopeMetadata
 )
 
+# Crew speeds the engine times paths with, in m/s
+WALKING_SPEED = 1.2
+EMERGENCY_SPEED = WALKING_SPEED * 1.5
+
+
+@lru_cache(maxsize=None)
+def _create_test_layout(layout_id: str, crew_modules: int = 4) -> LayoutSpec:
+    """
+    Helper to create test layouts with specified number of crew modules.
+    
+    Cached on (layout_id, crew_modules); callers share the returned layout and must not mutate it.
+    """
+    
+    modules = []
+    
+    # Add crew quarters on a 2.5m ring; plain floats keep Pydantic off the numpy scalar path
+    angles = np.linspace(0, 2 * np.pi, crew_modules, endpoint=False)
+    xs = (2.5 * np.cos(angles)).tolist()
+    ys = (2.5 * np.sin(angles)).tolist()
+    
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        modules.append(ModulePlacement(
+            module_id=f"sleep_quarter_{i:03d}_test",
+            type=ModuleType.SLEEP_QUARTER,
+            position=[x, y, -4.0],
+            rotation_deg=0,
+            connections=["galley_001_test"]
+        ))
+    
+    # Add common modules
+    modules.extend([
+        ModulePlacement(
+            module_id="galley_001_test",
+            type=ModuleType.GALLEY,
+            position=[0.0, 0.0, 0.0],
+            rotation_deg=0,
+            connections=[f"sleep_quarter_{i:03d}_test" for i in range(crew_modules)] + ["laboratory_001_test", "airlock_001_test"]
+        ),
+        ModulePlacement(
+            module_id="laboratory_001_test",
+            type=ModuleType.LABORATORY,
+            position=[0.0, 0.0, 4.0],
+            rotation_deg=0,
+            connections=["galley_001_test", "airlock_001_test"]
+        ),
+        ModulePlacement(
+            module_id="airlock_001_test",
+            type=ModuleType.AIRLOCK,
+            position=[3.0, 0.0, 4.0],
+            rotation_deg=90,
+            connections=["galley_001_test", "laboratory_001_test"]
+        )
+    ])
+    
+    return LayoutSpec(
+        layout_id=layout_id,
+        envelope_id="test_envelope",
+        modules=modules,
+        kpis=PerformanceMetrics(
+            mean_transit_time=0.0,
+            egress_time=0.0,
+            mass_total=0.0,
+            power_budget=0.0,
+            thermal_margin=0.0,
+            lss_margin=0.0,
+            stowage_utilization=0.0
+        ),
+        explainability=f"Test layout {layout_id} with {crew_modules} crew modules"
+    )
+
+
+@pytest.fixture(scope="module")
+def test_envelope():
+    """Create test envelope shared by every scoring test"""
+    return EnvelopeSpec(
+        id="scoring_test_envelope",
+        type=EnvelopeType.CYLINDER,
+        params={"radius": 4.0, "length": 16.0},
+        coordinate_frame=CoordinateFrame.LOCAL,
+        metadata=EnvelopeMetadata(name="Scoring Test", creator="test")
+    )
+
 
 class TestScoringEngineAccuracy:
     """Test scoring engine calculation accuracy"""
@@ -19,20 +105,9 @@ class TestScoringEngineAccuracy:
     @pytest.fixture
     def scoring_engine(self):
         """Create scoring engine instance"""
-        return ScoringEngine()
-    
-    @pytest.fixture
-    def test_envelope(self):
-        """Create test envelope"""
-        return EnvelopeSpec(
-            id="scoring_test_envelope",
-            type=EnvelopeType.CYLINDER,
-            params={"radius": 4.0, "length": 16.0},
-            coordinate_frame=CoordinateFrame.LOCAL,
-            metadata=EnvelopeMetadata(name="Scoring Test", creator="test")
-        )
+        return EnhancedScoringEngine()
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def test_mission(self):
         """Create test mission parameters"""
         return MissionParameters(
@@ -46,44 +121,44 @@ class TestScoringEngineAccuracy:
             }
         )
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def simple_layout(self, test_envelope):
         """Create simple test layout"""
         modules = [
             ModulePlacement(
-                module_id="sleep_001",
+                module_id="sleep_quarter_001_test",
                 type=ModuleType.SLEEP_QUARTER,
                 position=[2.0, 0.0, -6.0],
                 rotation_deg=0,
-                connections=["galley_001"]
+                connections=["galley_001_test"]
             ),
             ModulePlacement(
-                module_id="sleep_002",
+                module_id="sleep_quarter_002_test",
                 type=ModuleType.SLEEP_QUARTER,
                 position=[-2.0, 0.0, -6.0],
                 rotation_deg=0,
-                connections=["galley_001"]
+                connections=["galley_001_test"]
             ),
             ModulePlacement(
-                module_id="galley_001",
+                module_id="galley_001_test",
                 type=ModuleType.GALLEY,
                 position=[0.0, 0.0, 0.0],
                 rotation_deg=0,
-                connections=["sleep_001", "sleep_002", "lab_001", "airlock_001"]
+                connections=["sleep_quarter_001_test", "sleep_quarter_002_test", "laboratory_001_test", "airlock_001_test"]
             ),
             ModulePlacement(
-                module_id="lab_001",
+                module_id="laboratory_001_test",
                 type=ModuleType.LABORATORY,
                 position=[0.0, 0.0, 6.0],
                 rotation_deg=0,
-                connections=["galley_001", "airlock_001"]
+                connections=["galley_001_test", "airlock_001_test"]
             ),
             ModulePlacement(
-                module_id="airlock_001",
+                module_id="airlock_001_test",
                 type=ModuleType.AIRLOCK,
                 position=[3.0, 0.0, 6.0],
                 rotation_deg=90,
-                connections=["galley_001", "lab_001"]
+                connections=["galley_001_test", "laboratory_001_test"]
             )
         ]
         
@@ -104,122 +179,45 @@ class TestScoringEngineAccuracy:
         )
     
     @pytest.mark.asyncio
-    async def test_transit_time_calculation_accuracy(self, scoring_engine, simple_layout, test_mission):
-        """Test accuracy of transit time calculations"""
-        
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
-        
-        # Transit time should be positive and reasonable
-        assert metrics.mean_transit_time > 0
-        assert metrics.mean_transit_time < 300  # Less than 5 minutes for this simple layout
-        
-        # Manual verification for known distances
-        # Distance from sleep_001 to galley_001 should be ~6m
-        # Distance from galley_001 to lab_001 should be ~6m
-        # Average walking speed ~1.5 m/s, so transit times should be ~4s and ~4s
-        
-        # The calculated mean should be reasonable for this layout
-        expected_range = (10, 60)  # 10-60 seconds seems reasonable
-        assert expected_range[0] <= metrics.mean_transit_time <= expected_range[1]
-    
-    @pytest.mark.asyncio
-    async def test_egress_time_calculation_accuracy(self, scoring_engine, simple_layout, test_mission):
-        """Test accuracy of emergency egress time calculations"""
-        
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
-        
-        # Egress time should be positive and reasonable
-        assert metrics.egress_time > 0
-        assert metrics.egress_time < 600  # Less than 10 minutes
-        
-        # For this layout, worst case is from sleep quarters to airlock
-        # Distance from sleep_001 to airlock_001 via galley should be calculable
-        # sqrt((2-3)^2 + (0-0)^2 + (-6-6)^2) = sqrt(1 + 144) = ~12m direct
-        # Via galley: 6m + 6.7m = ~12.7m
-        # At emergency speed (~2 m/s), should be ~6-7 seconds
-        
-        expected_range = (5, 120)  # 5-120 seconds for emergency egress
-        assert expected_range[0] <= metrics.egress_time <= expected_range[1]
-    
-    @pytest.mark.asyncio
-    async def test_mass_calculation_accuracy(self, scoring_engine, simple_layout, test_mission):
-        """Test accuracy of total mass calculations"""
-        
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
+    async def test_all_accuracy_ranges(self, scoring_engine, test_envelope, simple_layout, test_mission):
+        """Test accuracy of every core metric from a single scoring pass"""
         
-        # Mass should be positive
-        assert metrics.mass_total > 0
+        metrics = await scoring_engine.calculate_metrics(simple_layout.modules, test_envelope, test_mission)
         
-        # Manual calculation based on standard module masses
-        # Sleep quarters: ~450kg each (2 modules = 900kg)
-        # Galley: ~800kg
-        # Laboratory: ~1200kg  
-        # Airlock: ~600kg
-        # Total expected: ~3500kg
+        # Straight-line distances between all module pairs give the time bounds
+        positions = np.array([m.position for m in simple_layout.modules])
+        index = {m.module_id: i for i, m in enumerate(simple_layout.modules)}
+        distances = np.linalg.norm(positions[:, None, :] - positions[None, :, :], axis=-1)
         
-        expected_range = (2000, 6000)  # 2-6 tons seems reasonable
-        assert expected_range[0] <= metrics.mass_total <= expected_range[1]
+        # Transit time: mean straight-line distance at walking speed
+        transit_estimate = distances[np.triu_indices(len(positions), k=1)].mean() / WALKING_SPEED
+        assert 0.5 * transit_estimate <= metrics.mean_transit_time <= 2 * transit_estimate
         
-        # Should be close to sum of individual module masses
-        # Allow for some variation due to connections, structure, etc.
-        base_mass = 450 * 2 + 800 + 1200 + 600  # 3500kg
-        assert abs(metrics.mass_total - base_mass) / base_mass < 0.5  # Within 50%
-    
-    @pytest.mark.asyncio
-    async def test_power_calculation_accuracy(self, scoring_engine, simple_layout, test_mission):
-        """Test accuracy of power budget calculations"""
+        # Egress time: worst case is sleep quarters to airlock at emergency speed
+        egress_estimate = distances[index["sleep_quarter_001_test"], index["airlock_001_test"]] / EMERGENCY_SPEED
+        assert 0.5 * egress_estimate <= metrics.egress_time <= 2 * egress_estimate
         
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
+        # Module budgets straight from the standard library definitions
+        library = get_module_library()
+        specs = [library.get_module(f"std_{m.type}").spec for m in simple_layout.modules]
+        module_mass = sum(spec.mass_kg for spec in specs)
+        module_power = sum(spec.power_w for spec in specs)
         
-        # Power should be positive
-        assert metrics.power_budget > 0
-        
-        # Manual calculation based on standard module power consumption
-        # Sleep quarters: ~75W each (2 modules = 150W)
-        # Galley: ~500W
-        # Laboratory: ~800W
-        # Airlock: ~200W
-        # Total expected: ~1650W
-        
-        expected_range = (1000, 3000)  # 1-3kW seems reasonable
-        assert expected_range[0] <= metrics.power_budget <= expected_range[1]
-    
-    @pytest.mark.asyncio
-    async def test_thermal_margin_calculation(self, scoring_engine, simple_layout, test_mission):
-        """Test thermal margin calculation accuracy"""
+        # Mass: modules plus LSS and power system equipment, which shouldn't double it
+        assert module_mass <= metrics.mass_total <= 2 * module_mass
         
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
+        # Power: module draw plus crew and life support loads
+        assert module_power <= metrics.power_budget <= 2 * module_power
         
-        # Thermal margin should be a reasonable percentage
+        # Thermal margin: not critically overheated
         assert -1.0 <= metrics.thermal_margin <= 1.0
+        assert metrics.thermal_margin > -0.5
         
-        # For a well-designed layout, thermal margin should be positive
-        # (indicating adequate cooling capacity)
-        assert metrics.thermal_margin > -0.5  # Not critically overheated
-    
-    @pytest.mark.asyncio
-    async def test_lss_margin_calculation(self, scoring_engine, simple_layout, test_mission):
-        """Test life support systems margin calculation accuracy"""
-        
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
-        
-        # LSS margin should be a reasonable percentage
+        # LSS margin: 4 crew should not be critically undersized
         assert -1.0 <= metrics.lss_margin <= 1.0
+        assert metrics.lss_margin > -0.3
         
-        # For 4 crew members, LSS should be adequate with some margin
-        assert metrics.lss_margin > -0.3  # Not critically undersized
-    
-    @pytest.mark.asyncio
-    async def test_stowage_utilization_accuracy(self, scoring_engine, simple_layout, test_mission):
-        """Test stowage utilization calculation accuracy"""
-        
-        metrics = await scoring_engine.calculate_metrics(simple_layout, test_mission)
-        
-        # Stowage utilization should be non-negative
-        assert metrics.stowage_utilization >= 0
-        
-        # For 4 crew, 180 days, should have reasonable utilization
-        # Not overcrowded (>1.0) but not empty (<0.1)
+        # Stowage: 4 crew for 180 days is neither empty nor badly overcrowded
         assert 0.1 <= metrics.stowage_utilization <= 1.5
 
 
@@ -228,44 +226,79 @@ class TestScoringEngineConsistency:
     
     @pytest.fixture
     def scoring_engine(self):
-        return ScoringEngine()
+        return EnhancedScoringEngine()
     
     @pytest.mark.asyncio
-    async def test_calculation_repeatability(self, scoring_engine):
+    async def test_calculation_repeatability(self, scoring_engine, test_envelope):
         """Test that identical inputs produce identical outputs"""
         
         # Create identical layouts
-        layout1 = self._create_test_layout("layout1")
-        layout2 = self._create_test_layout("layout2")  # Same content, different ID
+        layout1 = _create_test_layout("layout1")
+        layout2 = _create_test_layout("layout2")  # Same content, different ID
         
         mission = MissionParameters(crew_size=3, duration_days=90)
         
-        # Calculate metrics for both
-        metrics1 = await scoring_engine.calculate_metrics(layout1, mission)
-        metrics2 = await scoring_engine.calculate_metrics(layout2, mission)
-        
-        # Results should be identical (within floating-point precision)
-        assert abs(metrics1.mean_transit_time - metrics2.mean_transit_time) < 1e-6
-        assert abs(metrics1.egress_time - metrics2.egress_time) < 1e-6
-        assert abs(metrics1.mass_total - metrics2.mass_total) < 1e-6
-        assert abs(metrics1.power_budget - metrics2.power_budget) < 1e-6
-        assert abs(metrics1.thermal_margin - metrics2.thermal_margin) < 1e-6
-        assert abs(metrics1.lss_margin - metrics2.lss_margin) < 1e-6
-        assert abs(metrics1.stowage_utilization - metrics2.stowage_utilization) < 1e-6
+        # Calculate metrics for both; a fresh engine scores the second so the
+        # metrics cache can't hand back the first result
+        metrics1 = await scoring_engine.calculate_metrics(layout1.modules, test_envelope, mission)
+        metrics2 = await EnhancedScoringEngine().calculate_metrics(layout2.modules, test_envelope, mission)
+        
+        # Scoring is deterministic, so results should be bit-identical
+        assert metrics1 is not metrics2
+        assert metrics1.model_dump() == metrics2.model_dump()
     
     @pytest.mark.asyncio
-    async def test_metric_scaling_consistency(self, scoring_engine):
+    async def test_library_change_invalidates_cache(self, test_envelope, tmp_path):
+        """Test that re-scoring after a library change sees the new module definition"""
+        
+        library = ModuleLibrary(assets_path=tmp_path)
+        engine = EnhancedScoringEngine()
+        engine.module_library = library
+        
+        # Custom crate built from the standard storage module, with its asset in place
+        storage = library.get_module("std_storage")
+        crate = storage.model_copy(update={
+            "spec": storage.spec.model_copy(update={"module_id": "custom_crate", "mass_kg": 120.0})
+        })
+        asset_path = tmp_path / crate.asset.file_path
+        asset_path.parent.mkdir(parents=True, exist_ok=True)
+        asset_path.touch()
+        
+        modules = [
+            ModulePlacement(
+                module_id="custom_crate",
+                type=ModuleType.STORAGE,
+                position=[0.0, 0.0, 0.0],
+                rotation_deg=0,
+                connections=[]
+            )
+        ]
+        mission = MissionParameters(crew_size=2, duration_days=30)
+        
+        # Unknown id: scored with the 1000 kg default
+        before = await engine.calculate_metrics(modules, test_envelope, mission)
+        
+        assert library.add_custom_module(crate)
+        after = await engine.calculate_metrics(modules, test_envelope, mission)
+        
+        assert before.mass_total - after.mass_total == pytest.approx(1000.0 - 120.0)
+    
+    @pytest.mark.asyncio
+    async def test_metric_scaling_consistency(self, scoring_engine, test_envelope):
         """Test that metrics scale consistently with layout changes"""
         
         # Create layouts with different crew sizes
-        small_layout = self._create_test_layout("small", crew_modules=2)
-        large_layout = self._create_test_layout("large", crew_modules=6)
+        small_layout = _create_test_layout("small", crew_modules=2)
+        large_layout = _create_test_layout("large", crew_modules=6)
         
         small_mission = MissionParameters(crew_size=2, duration_days=90)
         large_mission = MissionParameters(crew_size=6, duration_days=90)
         
-        small_metrics = await scoring_engine.calculate_metrics(small_layout, small_mission)
-        large_metrics = await scoring_engine.calculate_metrics(large_layout, large_mission)
+        # Independent scorings, awaited as one batch
+        small_metrics, large_metrics = await asyncio.gather(
+            scoring_engine.calculate_metrics(small_layout.modules, test_envelope, small_mission),
+            scoring_engine.calculate_metrics(large_layout.modules, test_envelope, large_mission)
+        )
         
         # Mass should scale with number of modules
         assert large_metrics.mass_total > small_metrics.mass_total
@@ -279,83 +312,25 @@ class TestScoringEngineConsistency:
             assert large_metrics.stowage_utilization >= small_metrics.stowage_utilization
     
     @pytest.mark.asyncio
-    async def test_mission_parameter_sensitivity(self, scoring_engine):
+    async def test_mission_parameter_sensitivity(self, scoring_engine, test_envelope):
         """Test that metrics respond appropriately to mission parameter changes"""
         
-        layout = self._create_test_layout("sensitivity_test")
+        layout = _create_test_layout("sensitivity_test")
         
         # Short vs long mission
         short_mission = MissionParameters(crew_size=4, duration_days=30)
         long_mission = MissionParameters(crew_size=4, duration_days=365)
         
-        short_metrics = await scoring_engine.calculate_metrics(layout, short_mission)
-        long_metrics = await scoring_engine.calculate_metrics(layout, long_mission)
+        short_metrics, long_metrics = await asyncio.gather(
+            scoring_engine.calculate_metrics(layout.modules, test_envelope, short_mission),
+            scoring_engine.calculate_metrics(layout.modules, test_envelope, long_mission)
+        )
         
         # Stowage utilization should be higher for longer missions
         assert long_metrics.stowage_utilization > short_metrics.stowage_utilization
         
         # LSS margin might be different due to longer operation requirements
         # (Could be lower due to more consumables needed)
-    
-    def _create_test_layout(self, layout_id: str, crew_modules: int = 4) -> LayoutSpec:
-        """Helper to create test layouts with specified number of crew modules"""
-        
-        modules = []
-        
-        # Add crew quarters
-        for i in range(crew_modules):
-            angle = (i / crew_modules) * 2 * np.pi
-            x = 2.5 * np.cos(angle)
-            y = 2.5 * np.sin(angle)
-            
-            modules.append(ModulePlacement(
-                module_id=f"sleep_{i:03d}",
-                type=ModuleType.SLEEP_QUARTER,
-                position=[x, y, -4.0],
-                rotation_deg=0,
-                connections=["galley_001"]
-            ))
-        
-        # Add common modules
-        modules.extend([
-            ModulePlacement(
-                module_id="galley_001",
-                type=ModuleType.GALLEY,
-                position=[0.0, 0.0, 0.0],
-                rotation_deg=0,
-                connections=[f"sleep_{i:03d}" for i in range(crew_modules)] + ["lab_001", "airlock_001"]
-            ),
-            ModulePlacement(
-                module_id="lab_001",
-                type=ModuleType.LABORATORY,
-                position=[0.0, 0.0, 4.0],
-                rotation_deg=0,
-                connections=["galley_001", "airlock_001"]
-            ),
-            ModulePlacement(
-                module_id="airlock_001",
-                type=ModuleType.AIRLOCK,
-                position=[3.0, 0.0, 4.0],
-                rotation_deg=90,
-                connections=["galley_001", "lab_001"]
-            )
-        ])
-        
-        return LayoutSpec(
-            layout_id=layout_id,
-            envelope_id="test_envelope",
-            modules=modules,
-            kpis=PerformanceMetrics(
-                mean_transit_time=0.0,
-                egress_time=0.0,
-                mass_total=0.0,
-                power_budget=0.0,
-                thermal_margin=0.0,
-                lss_margin=0.0,
-                stowage_utilization=0.0
-            ),
-            explainability=f"Test layout {layout_id} with {crew_modules} crew modules"
-        )
 
 
 class TestScoringEngineEdgeCases:
@@ -363,45 +338,31 @@ class TestScoringEngineEdgeCases:
     
     @pytest.fixture
     def scoring_engine(self):
-        return ScoringEngine()
+        return EnhancedScoringEngine()
     
     @pytest.mark.asyncio
-    async def test_empty_layout_handling(self, scoring_engine):
+    async def test_empty_layout_handling(self, scoring_engine, test_envelope):
         """Test handling of empty or minimal layouts"""
         
-        # Layout with no modules
-        empty_layout = LayoutSpec(
-            layout_id="empty_layout",
-            envelope_id="test_envelope",
-            modules=[],
-            kpis=PerformanceMetrics(
-                mean_transit_time=0.0,
-                egress_time=0.0,
-                mass_total=0.0,
-                power_budget=0.0,
-                thermal_margin=0.0,
-                lss_margin=0.0,
-                stowage_utilization=0.0
-            ),
-            explainability="Empty layout for testing"
-        )
-        
         mission = MissionParameters(crew_size=1, duration_days=30)
         
+        # LayoutSpec requires at least one module, so score an empty placement list directly.
         # Should handle gracefully (either return zeros or raise appropriate error)
         try:
-            metrics = await scoring_engine.calculate_metrics(empty_layout, mission)
+            metrics = await scoring_engine.calculate_metrics([], test_envelope, mission)
             
-            # If it succeeds, metrics should be zero or indicate no modules
-            assert metrics.mass_total == 0
-            assert metrics.power_budget == 0
+            # If it succeeds, module-driven metrics should be zero; crew life
+            # support and power equipment still carry mass and power
+            assert metrics.mean_transit_time == 0
+            assert metrics.volume_utilization == 0
+            assert metrics.egress_time == 999.0  # No airlock
             
         except ScoringError as e:
             # Acceptable to raise error for empty layout
             assert "empty" in str(e).lower() or "no modules" in str(e).lower()
     
     @pytest.mark.asyncio
-    async def test_disconnected_layout_handling(self, scoring_engine):
+    async def test_disconnected_layout_handling(self, scoring_engine, test_envelope):
         """Test handling of layouts with disconnected modules"""
         
         # Layout with disconnected modules
@@ -439,17 +400,29 @@ class TestScoringEngineEdgeCases:
         mission = MissionParameters(crew_size=2, duration_days=30)
         
         try:
-            metrics = await scoring_engine.calculate_metrics(disconnected_layout, mission)
+            metrics = await scoring_engine.calculate_metrics(disconnected_layout.modules, test_envelope, mission)
             
-            # Transit time should be very high or infinite for disconnected modules
-            assert metrics.mean_transit_time > 1000 or metrics.mean_transit_time == float('inf')
+            # Unreachable pairs are charged a finite 5 minute penalty rather than inf
+            assert metrics.mean_transit_time >= 300.0
+            assert math.isfinite(metrics.mean_transit_time)
             
         except ScoringError as e:
             # Acceptable to raise error for disconnected layout
             assert "disconnect" in str(e).lower() or "path" in str(e).lower()
     
+    def test_small_overshoots_clamped_quietly(self, caplog):
+        """Test that values just past a metric range are clamped without a warning"""
+        
+        assert EnhancedScoringEngine._clamp_metric("lss_margin", -0.4, -0.2, 1.0) == -0.2
+        assert EnhancedScoringEngine._clamp_metric("stowage_utilization", 3.5, high=2.0) == 2.0
+        assert EnhancedScoringEngine._clamp_metric("thermal_margin", 0.3, -0.5, 1.0) == 0.3
+        assert caplog.text == ""
+        
+        assert EnhancedScoringEngine._clamp_metric("thermal_margin", -12.0, -0.5, 1.0) == -0.5
+        assert "thermal_margin" in caplog.text
+    
     @pytest.mark.asyncio
-    async def test_extreme_parameter_handling(self, scoring_engine):
+    async def test_extreme_parameter_handling(self, scoring_engine, test_envelope, caplog):
         """Test handling of extreme mission parameters"""
         
         layout = LayoutSpec(
@@ -457,7 +430,7 @@ class TestScoringEngineEdgeCases:
             envelope_id="test_envelope",
             modules=[
                 ModulePlacement(
-                    module_id="airlock_001",
+                    module_id="airlock_001_test",
                     type=ModuleType.AIRLOCK,
                     position=[0.0, 0.0, 0.0],
                     rotation_deg=0,
@@ -476,18 +449,23 @@ class TestScoringEngineEdgeCases:
             explainability="Extreme parameter test layout"
         )
         
-        # Extreme mission: many crew, very long duration
+        # Extreme mission: largest crew and longest duration MissionParameters allows
         extreme_mission = MissionParameters(
-            crew_size=100,
-            duration_days=3650  # 10 years
+            crew_size=20,
+            duration_days=1000
         )
         
         try:
-            metrics = await scoring_engine.calculate_metrics(layout, extreme_mission)
+            metrics = await scoring_engine.calculate_metrics(layout.modules, test_envelope, extreme_mission)
+            
+            # Should handle extreme values gracefully; the engine raises
+            # ScoringError rather than returning non-finite metrics
+            assert metrics.stowage_utilization >= 0
             
-            # Should handle extreme values gracefully
-            assert not np.isnan(metrics.stowage_utilization)
-            assert not np.isinf(metrics.lss_margin) or metrics.lss_margin == float('-inf')
+            # One airlock's stowage is far short of 20 crew for 1000 days; the
+            # clamp to the metric ceiling must not be silent
+            assert metrics.stowage_utilization == 2.0
+            assert "stowage_utilization" in caplog.text
             
         except ScoringError as e:
             # Acceptable to raise error for impossible scenarios
@@ -495,7 +473,7 @@ class TestScoringEngineEdgeCases:
                       ["extreme", "impossible", "capacity", "overflow"])
     
     @pytest.mark.asyncio
-    async def test_numerical_stability(self, scoring_engine):
+    async def test_numerical_stability(self, scoring_engine, test_envelope):
         """Test numerical stability with very small or large values"""
         
         # Layout with modules at very small distances
@@ -532,11 +510,10 @@ class TestScoringEngineEdgeCases:
         
         mission = MissionParameters(crew_size=1, duration_days=1)
         
-        metrics = await scoring_engine.calculate_metrics(close_layout, mission)
+        metrics = await scoring_engine.calculate_metrics(close_layout.modules, test_envelope, mission)
         
-        # Should handle very small distances without numerical issues
-        assert not np.isnan(metrics.mean_transit_time)
-        assert not np.isinf(metrics.mean_transit_time)
+        # Should handle very small distances without numerical issues; the
+        # engine raises ScoringError rather than returning non-finite metrics
         assert metrics.mean_transit_time >= 0
 
 